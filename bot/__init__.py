@@ -19,22 +19,42 @@ QuickSwap, and others.
 __version__ = "1.0.0"
 __author__ = "Flashloan Arbitrage Bot Team"
 
-# Core components
-from .arbitrage_bot import FlashloanArbitrageBot as ArbitrageBot
-from .opportunity_scanner import OpportunityScanner
-from .risk_manager import RiskManager
-from .contract_interface import ContractInterface
-from .price_feeds import PriceFeeds
-
-# Utilities
-from .utils.logger import setup_logger
-from .utils.notifications import NotificationManager
-from .utils.helpers import (
-    format_amount,
-    calculate_profit_percentage,
-    validate_address,
-    get_token_decimals
-)
+import importlib
+
+# Core components and utilities are imported on first attribute access
+# (PEP 562), so importing a submodule such as bot.utils.logger doesn't
+# pull in web3/aiohttp/requests through this package
+_LAZY = {
+    # Core components
+    "ArbitrageBot": ("arbitrage_bot", "FlashloanArbitrageBot"),
+    "OpportunityScanner": ("opportunity_scanner", "OpportunityScanner"),
+    "RiskManager": ("risk_manager", "RiskManager"),
+    "ContractInterface": ("contract_interface", "ContractInterface"),
+    "PriceFeeds": ("price_feeds", "PriceFeeds"),
+
+    # Utilities
+    "setup_logger": ("utils.logger", "setup_logger"),
+    "NotificationManager": ("utils.notifications", "NotificationManager"),
+    "format_amount": ("utils.helpers", "format_amount"),
+    "calculate_profit_percentage": ("utils.helpers", "calculate_profit_percentage"),
+    "validate_address": ("utils.helpers", "validate_address"),
+    "get_token_decimals": ("utils.helpers", "get_token_decimals"),
+}
+
+
+def __getattr__(name):
+    target = _LAZY.get(name)
+    if target is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attr = target
+    value = getattr(importlib.import_module(f".{module_name}", __name__), attr)
+    globals()[name] = value  # Cache so later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
+
 
 # Package-level logger
 import logging
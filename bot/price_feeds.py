@@ -254,7 +254,7 @@ class PriceFeeds:
                 )
 
         except Exception as e:
-            logger.debug(f"Uniswap V3 quote failed for {token_in[:8]}.../{token_out[:8]}...: {e}")
+            logger.debug("Uniswap V3 quote failed for %.8s.../%.8s...: %s", token_in, token_out, e)
 
         return None
 
@@ -287,7 +287,7 @@ class PriceFeeds:
                 )
 
         except Exception as e:
-            logger.debug(f"SushiSwap quote failed for {token_in[:8]}.../{token_out[:8]}...: {e}")
+            logger.debug("SushiSwap quote failed for %.8s.../%.8s...: %s", token_in, token_out, e)
 
         return None
 
@@ -320,7 +320,7 @@ class PriceFeeds:
                 )
 
         except Exception as e:
-            logger.debug(f"QuickSwap quote failed for {token_in[:8]}.../{token_out[:8]}...: {e}")
+            logger.debug("QuickSwap quote failed for %.8s.../%.8s...: %s", token_in, token_out, e)
 
         return None
 
@@ -349,7 +349,7 @@ class PriceFeeds:
                 if isinstance(result, PriceQuote):
                     quotes.append(result)
 
-        logger.debug(f"Retrieved {len(quotes)} quotes for {token_in[:8]}...→{token_out[:8]}...")
+        logger.debug("Retrieved %d quotes for %.8s...→%.8s...", len(quotes), token_in, token_out)
         return quotes
 
     def _calculate_gas_cost_usd(self, total_gas: int) -> Decimal:
@@ -450,15 +450,17 @@ class PriceFeeds:
 
                                 opportunities.append(opportunity)
 
-                                logger.info(f"💎 OPPORTUNITY FOUND:")
-                                logger.info(
-                                    f"   {self._get_token_symbol(token_in)} → {self._get_token_symbol(token_out)}")
-                                logger.info(f"   Buy: {best_buy.dex} | Sell: {best_sell.dex}")
-                                logger.info(f"   Profit: {profit_percentage:.3f}% (${net_profit_usd:.2f} net)")
-                                logger.info(f"   Gas cost: ${gas_cost_usd:.3f}")
+                                # Skip building the report when INFO is off
+                                if logger.isEnabledFor(logging.INFO):
+                                    logger.info(f"💎 OPPORTUNITY FOUND:")
+                                    logger.info(
+                                        f"   {self._get_token_symbol(token_in)} → {self._get_token_symbol(token_out)}")
+                                    logger.info(f"   Buy: {best_buy.dex} | Sell: {best_sell.dex}")
+                                    logger.info(f"   Profit: {profit_percentage:.3f}% (${net_profit_usd:.2f} net)")
+                                    logger.info(f"   Gas cost: ${gas_cost_usd:.3f}")
 
                 except Exception as e:
-                    logger.debug(f"Error processing {token_in[:8]}.../{token_out[:8]}...: {e}")
+                    logger.debug("Error processing %.8s.../%.8s...: %s", token_in, token_out, e)
 
                 await asyncio.sleep(0.1)
 
@@ -5,9 +5,14 @@ Provides safety checks, position limits, and emergency controls with proper Poly
 """
 
 import asyncio
+import functools
+import hashlib
+import logging
+import sys
 import time
-from typing import Dict, List, Optional, Tuple, Any
-from dataclasses import dataclass, asdict
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, NamedTuple, Optional, Tuple, Any
+from dataclasses import dataclass
 from decimal import Decimal
 from datetime import datetime, timedelta
 
@@ -20,10 +25,82 @@ from config.settings import Settings
 
 logger = get_logger(__name__)
 
+# Circuit breaker states
+CB_CLOSED = 0
+CB_OPEN = 1
+CB_HALF_OPEN = 2
+_CB_STATE_NAMES = ("CLOSED", "OPEN", "HALF_OPEN")
+
+# Trading gate bits - any set bit sends an assessment down the slow path
+_GATE_EMERGENCY = 1
+_GATE_CIRCUIT = 2  # Circuit breaker not CLOSED
+
+# Opportunity fields that decide whether a blocked opportunity is a repeat
+_FINGERPRINT_FIELDS = ('token_in', 'token_out', 'amount_in', 'profit_usd', 'gas_cost_usd', 'slippage')
+
+# Decimal constants for the stored error-path metrics - parsed once at import
+_D_ZERO = Decimal("0")
+_D_ONE = Decimal("1")
+_D_999 = Decimal("999")
+
+
+def _usdc_wei_to_cents(amount_in: Any) -> int:
+    """Convert a USDC amount in wei (6 decimals) to integer USD cents"""
+    if isinstance(amount_in, int):
+        return amount_in // 10_000
+    return int(Decimal(str(amount_in)) / 10_000)
+
+
+def _canonical_addr(address: str) -> str:
+    """Lowercased, interned form of a token address used for all lookups and cache keys"""
+    return sys.intern(address.lower())
+
+
+# Major Polygon tokens - EXPANDED LIST (lowercase)
+_MAJOR_TOKENS = frozenset({
+    '0x2791bca1f2de4661ed88a30c99a7a9449aa84174',  # USDC
+    '0xc2132d05d31c914a87c6611c10748aeb04b58e8f',  # USDT
+    '0x8f3cf7ad23cd3cadbd9735aff958023239c6a063',  # DAI
+    '0x0d500b1d8e8ef31e21c99d1db9a6444d3adf1270',  # WMATIC
+    '0x7ceb23fd6bc0add59e62ac25578270cff1b9f619',  # WETH
+    '0x1bfd67037b42cf73acf2047067bd4f2c47d9bfd6',  # WBTC
+    '0x53e0bca35ec356bd5dddfebbd1fc0fd03fabad39',  # LINK
+    '0xd6df932a45c0f255f85145f286ea0b292b21c90b',  # AAVE
+})
+
+# Major pairs with deep liquidity - a subset of _MAJOR_TOKENS
+_DEEP_LIQUIDITY_TOKENS = frozenset({
+    '0x2791bca1f2de4661ed88a30c99a7a9449aa84174',  # USDC
+    '0x0d500b1d8e8ef31e21c99d1db9a6444d3adf1270',  # WMATIC
+    '0x7ceb23fd6bc0add59e62ac25578270cff1b9f619',  # WETH
+})
+
+
+def _format_usd_limit(value: float) -> str:
+    """Format a USD limit the way the former Decimal limits printed (10000, 0.50)"""
+    if value == int(value):
+        return f"{value:.0f}"
+    return f"{value:.2f}" if round(value, 2) == value else repr(value)
+
+
+@functools.lru_cache(maxsize=256)
+def _validate_token_pair_cached(token_in_lower: str, token_out_lower: str) -> bool:
+    """Validate a lowercased token pair - pure, so cached for the process lifetime"""
+    # Both tokens must be in our supported list - membership also implies a valid address
+    if token_in_lower in _MAJOR_TOKENS and token_out_lower in _MAJOR_TOKENS:
+        logger.debug("✅ Token pair validated: %s.../%s...", token_in_lower[:8], token_out_lower[:8])
+        return True
+
+    logger.debug("❌ Unsupported token pair: %s.../%s...", token_in_lower[:8], token_out_lower[:8])
+    return False
+
 
 @dataclass
 class RiskMetrics:
     """Risk assessment metrics for trade evaluation"""
+    __slots__ = ('profit_threshold_usd', 'max_slippage', 'min_liquidity', 'gas_cost_ratio',
+                 'network_congestion', 'price_impact', 'execution_time_limit', 'confidence_score')
+
     profit_threshold_usd: Decimal
     max_slippage: Decimal
     min_liquidity: int
@@ -37,6 +114,8 @@ class RiskMetrics:
 @dataclass
 class TradeRisk:
     """Individual trade risk assessment"""
+    __slots__ = ('is_safe', 'risk_score', 'warnings', 'blockers', 'metrics', 'timestamp')
+
     is_safe: bool
     risk_score: float
     warnings: List[str]
@@ -45,6 +124,16 @@ class TradeRisk:
     timestamp: float
 
 
+class TradeRecord(NamedTuple):
+    """Executed trade outcome kept in the risk manager's trade history"""
+    timestamp: float
+    opportunity: Dict
+    success: bool
+    profit: Optional[Decimal]
+    error: Optional[str]
+    consecutive_failures: int
+
+
 class RiskManager:
     """
     Advanced Risk Management System with corrected Polygon calculations
@@ -62,152 +151,351 @@ class RiskManager:
         self.settings = settings
         self.web3 = web3
 
-        # Add POA middleware for Polygon
-        if not any(isinstance(middleware, type(ExtraDataToPOAMiddleware))
-                   for middleware in self.web3.middleware_onion):
-            self.web3.middleware_onion.inject(ExtraDataToPOAMiddleware, layer=0)
+        # Add POA middleware for Polygon under a named layer so it is only injected once
+        try:
+            self.web3.middleware_onion.inject(ExtraDataToPOAMiddleware, layer=0, name='poa')
+        except ValueError:
+            pass  # Already registered by another component sharing this Web3 instance
 
         # Risk Configuration - CORRECTED FOR REALISTIC TRADING
-        self.max_position_size_usd = Decimal("10000")  # $10k max position
-        self.daily_volume_limit_usd = Decimal("100000")  # $100k daily limit
+        # Plain floats - the assessment compares them against float inputs on every call
+        self.max_position_size_usd = 10000.0  # $10k max position
+        self.daily_volume_limit_usd = 100000.0  # $100k daily limit
+        self.daily_volume_limit_cents = int(self.daily_volume_limit_usd * 100)
         self.max_consecutive_failures = 5
-        self.min_profit_threshold_usd = Decimal("0.50")  # $0.50 minimum profit
-        self.max_slippage_tolerance = Decimal("0.03")  # 3% max slippage
-        self.gas_cost_max_ratio = Decimal("0.5")  # Gas can't exceed 50% of profit
+        self.min_profit_threshold_usd = 0.50  # $0.50 minimum profit
+        self.max_slippage_tolerance = 0.03  # 3% max slippage
+        self.gas_cost_max_ratio = 0.5  # Gas can't exceed 50% of profit
+
+        # Warning thresholds derived from the limits above - computed once
+        self._usdc_scale = 1e-6  # USDC wei -> USD
+        self._position_warn = self.max_position_size_usd * 0.8
+        self._profit_warn = self.min_profit_threshold_usd * 1.5
+        self._slippage_warn = self.max_slippage_tolerance * 0.7
+        self._gas_warn = self.gas_cost_max_ratio * 0.7
+        self._volume_warn_cents = self.daily_volume_limit_cents * 8 // 10
+
+        # Threshold checks as data: (input, sign, signed limit, signed warning threshold,
+        # limit, blocker weight, warning weight, blocker template, warning). A sign of -1
+        # turns a "below the minimum" check into the same greater-than comparison.
+        self._threshold_checks = tuple(
+            (name, sign, sign * limit, sign * warn, limit, block_weight, warn_weight, blocker, warning)
+            for name, sign, limit, warn, block_weight, warn_weight, blocker, warning in (
+                ('amount_in_usd', 1, self.max_position_size_usd, self._position_warn, 50, 15,
+                 "Position size ${amount_in_usd:.2f} exceeds limit ${limit_usd}",
+                 "Position size near limit"),
+                ('expected_profit_usd', -1, self.min_profit_threshold_usd, self._profit_warn, 30, 10,
+                 "Profit ${expected_profit_usd:.2f} below threshold ${limit_usd}",
+                 "Profit margin is low"),
+                ('slippage', 1, self.max_slippage_tolerance, self._slippage_warn, 40, 15,
+                 "Slippage {slippage:.2%} exceeds tolerance {limit:.2%}",
+                 "High slippage detected"),
+                ('gas_ratio', 1, self.gas_cost_max_ratio, self._gas_warn, 35, 12,
+                 "Gas cost ratio {gas_ratio:.2%} too high "
+                 "(${gas_cost_usd:.3f} gas vs ${expected_profit_usd:.2f} profit)",
+                 "Gas cost is significant portion of profit"),
+            )
+        )
 
         # State Tracking
         self.consecutive_failures = 0
-        self.daily_volume_usd = Decimal("0")
-        self.last_reset_date = datetime.now().date()
-        self.emergency_pause = False
-        self.circuit_breaker_active = False
-        self.circuit_breaker_until = None
+        self.daily_volume_cents = 0  # Integer USD cents - only compared against the limit
+        self._last_reset_day = int(time.time() // 86400)  # UTC epoch day of the last reset
+        self._gate_flags = 0  # _GATE_* bits; emergency_pause is derived from it
+
+        # Circuit Breaker: CLOSED -> OPEN -> HALF_OPEN -> CLOSED/OPEN
+        self._cb_state = CB_CLOSED
+        self._cb_lock = asyncio.Lock()
+        self._cb_until_mono: Optional[float] = None  # Monotonic deadline of the OPEN cooldown
+        self._cb_probe_started: Optional[float] = None  # Monotonic start of the in-flight HALF_OPEN probe
+        self.circuit_breaker_cooldown = 1800  # 30 minutes
+        self.circuit_breaker_probe_timeout = 300  # A probe never recorded frees its slot after 5 minutes
 
         # Performance Tracking
-        self.trade_history: List[Dict] = []
-        self.risk_assessments: List[TradeRisk] = []
+        # Fixed-capacity ring buffers - the oldest entries fall off automatically
+        self.trade_history: Deque[TradeRecord] = deque(maxlen=1000)
+        self.risk_assessments: Deque[TradeRisk] = deque(maxlen=100)
+
+        # Running aggregates over the buffers above, kept in step on every append
+        self._successful_trades = 0
+        self._recent_risk_scores: Deque[Tuple[float, float]] = deque()  # (monotonic time, risk_score)
+        self._recent_risk_sum = 0.0
         self.network_health_score = 1.0
 
         # Rate Limiting
-        self.last_trade_time = 0
-        self.min_trade_interval = 30  # 30 seconds between trades
+        # Token bucket: bursts of up to 3 trades, refilled at one trade per 30 seconds
+        self.last_trade_time = 0  # Wall clock, for status reporting
+        self._bucket_capacity = 3
+        self._bucket_tokens = 3.0
+        self._bucket_rate = 1.0 / 30.0  # tokens per second
+        self._bucket_last_refill = time.monotonic()
+
+        # Upper bound on the concurrent network/token/liquidity checks
+        self.async_checks_timeout = 2.0
+
+        # Network health score is reused for a couple of seconds (~1 Polygon block)
+        self.network_health_ttl = 2.0  # seconds
+        self._network_health_mono = float('-inf')
+
+        # Short-lived cache for liquidity scores (pair validation is cached at module level)
+        self.check_cache_ttl = 30  # seconds
+        self.check_cache_max_size = 1024
+        self._liquidity_cache: Dict[Tuple[str, str, int], Tuple[float, float]] = {}
+
+        # Recently blocked opportunity fingerprints -> (monotonic expiry, assessment)
+        self.recent_block_ttl = 30  # seconds
+        self.recent_block_max_size = 4096
+        self._recent_blocks: "OrderedDict[bytes, Tuple[float, TradeRisk]]" = OrderedDict()
+        self.cached_rejections = 0  # Assessments answered from _recent_blocks
 
         logger.info("🛡️ Risk Manager initialized with corrected Polygon calculations")
         self._log_risk_parameters()
 
     def _log_risk_parameters(self):
         """Log current risk management parameters"""
+        if not logger.isEnabledFor(logging.INFO):
+            return
         params = {
-            "max_position_size": f"${self.max_position_size_usd}",
-            "daily_volume_limit": f"${self.daily_volume_limit_usd}",
-            "min_profit_threshold": f"${self.min_profit_threshold_usd}",
+            "max_position_size": f"${_format_usd_limit(self.max_position_size_usd)}",
+            "daily_volume_limit": f"${_format_usd_limit(self.daily_volume_limit_usd)}",
+            "min_profit_threshold": f"${_format_usd_limit(self.min_profit_threshold_usd)}",
             "max_slippage": f"{self.max_slippage_tolerance:.2%}",
             "max_gas_ratio": f"{self.gas_cost_max_ratio:.2%}",
             "max_failures": self.max_consecutive_failures
         }
-        logger.info(f"🔧 Risk Parameters: {params}")
+        logger.info("🔧 Risk Parameters: %s", params)
+
+    @property
+    def daily_volume_usd(self) -> Decimal:
+        """Today's traded volume in USD"""
+        return Decimal(self.daily_volume_cents) / 100
+
+    @property
+    def circuit_breaker_active(self) -> bool:
+        """True while the circuit breaker is OPEN and still cooling down"""
+        return self._cb_state == CB_OPEN and time.monotonic() < self._cb_until_mono
+
+    @property
+    def circuit_breaker_until(self) -> Optional[datetime]:
+        """Wall-clock end of the OPEN cooldown, computed for display only"""
+        if self._cb_until_mono is None:
+            return None
+        return datetime.now() + timedelta(seconds=self._cb_until_mono - time.monotonic())
+
+    def _cb_compare_and_set(self, expected: int, new: int) -> bool:
+        """
+        Atomically move the circuit breaker from `expected` to `new`
+
+        Contains no await, so it cannot interleave with other coroutines.
+
+        Returns:
+            bool: True if the transition happened
+        """
+        if self._cb_state != expected:
+            return False
+        self._set_cb_state(new)
+        return True
+
+    def _set_cb_state(self, state: int):
+        """Set the circuit breaker state, keeping the circuit gate bit in step"""
+        self._cb_state = state
+        if state != CB_HALF_OPEN:
+            self._cb_probe_started = None  # Closing or re-opening ends the probe
+        if state == CB_CLOSED:
+            self._gate_flags &= ~_GATE_CIRCUIT
+        else:
+            self._gate_flags |= _GATE_CIRCUIT
+
+    @property
+    def emergency_pause(self) -> bool:
+        """Whether trading is halted by emergency_stop()"""
+        return bool(self._gate_flags & _GATE_EMERGENCY)
+
+    @emergency_pause.setter
+    def emergency_pause(self, paused: bool):
+        if paused:
+            self._gate_flags |= _GATE_EMERGENCY
+        else:
+            self._gate_flags &= ~_GATE_EMERGENCY
+
+    def _claim_probe(self) -> bool:
+        """
+        Claim the single HALF_OPEN probe slot, moving OPEN -> HALF_OPEN once the cooldown is over
+
+        Contains no await, so only one concurrent assessment can win the slot.
+
+        Returns:
+            bool: True if this assessment is the probe trade
+        """
+        now = time.monotonic()
+        if self._cb_state == CB_OPEN:
+            if now < self._cb_until_mono:
+                return False
+            if self._cb_compare_and_set(CB_OPEN, CB_HALF_OPEN):
+                logger.info("🟡 Circuit breaker half-open - Probing with next trade")
+
+        if self._cb_state != CB_HALF_OPEN:
+            return False
+        if (self._cb_probe_started is not None and
+                now - self._cb_probe_started < self.circuit_breaker_probe_timeout):
+            return False  # Another probe is still in flight
+
+        self._cb_probe_started = now
+        return True
+
+    def _release_probe(self):
+        """Free the probe slot when the probe assessment did not lead to a trade"""
+        if self._cb_state == CB_HALF_OPEN:
+            self._cb_probe_started = None
 
     async def assess_trade_risk(self, opportunity: Dict) -> TradeRisk:
         """
         Comprehensive trade risk assessment with corrected USD calculations
 
+        While the circuit breaker is HALF_OPEN only one assessment at a time is
+        let through as the probe trade; the others are blocked until
+        record_trade_result closes or re-opens the breaker.
+
         Args:
             opportunity: Trading opportunity data
 
         Returns:
             TradeRisk: Complete risk assessment
         """
+        probe = bool(self._gate_flags & _GATE_CIRCUIT) and self._claim_probe()
+        assessment = None
+        try:
+            assessment = await self._assess_trade_risk(opportunity, probe)
+            return assessment
+        finally:
+            # An unsafe (or aborted) probe assessment executes no trade, so give the slot back
+            if probe and (assessment is None or not assessment.is_safe):
+                self._release_probe()
+
+    async def _assess_trade_risk(self, opportunity: Dict, probe: bool) -> TradeRisk:
+        """Run the risk checks; probe is True if this assessment holds the HALF_OPEN probe slot"""
         try:
             warnings = []
             blockers = []
             risk_score = 0.0
 
             # Extract opportunity data - CORRECTED FOR USD VALUES
-            token_in = opportunity.get('token_in', '')
-            token_out = opportunity.get('token_out', '')
-            amount_in_usd = Decimal(str(opportunity.get('amount_in', 0))) / Decimal(
-                "1e6")  # Convert from USDC wei to USD
-            expected_profit_usd = Decimal(str(opportunity.get('profit_usd', 0)))
-            gas_cost_usd = Decimal(str(opportunity.get('gas_cost_usd', 0)))
-            slippage = Decimal(str(opportunity.get('slippage', 0)))
-
-            logger.info(
-                f"🔍 Assessing risk for ${amount_in_usd:.2f} trade with ${expected_profit_usd:.2f} expected profit")
-
-            # 1. Emergency Controls Check
-            if self.emergency_pause:
-                blockers.append("Emergency pause is active")
-                risk_score += 100
-
-            if self.circuit_breaker_active:
-                if datetime.now() < self.circuit_breaker_until:
-                    blockers.append(f"Circuit breaker active until {self.circuit_breaker_until}")
+            token_in = _canonical_addr(opportunity.get('token_in') or '')
+            token_out = _canonical_addr(opportunity.get('token_out') or '')
+            amount_in_usd = float(opportunity.get('amount_in', 0)) * self._usdc_scale  # Convert from USDC wei to USD
+            expected_profit_usd = float(opportunity.get('profit_usd', 0))
+            gas_cost_usd = float(opportunity.get('gas_cost_usd', 0))
+            slippage = float(opportunity.get('slippage', 0))
+
+            logger.info("🔍 Assessing risk for $%.2f trade with $%.2f expected profit",
+                        amount_in_usd, expected_profit_usd)
+
+            # 1. Emergency Controls Check - a single test while trading is allowed
+            gate_flags = self._gate_flags
+            if gate_flags:
+                if gate_flags & _GATE_EMERGENCY:
+                    blockers.append("Emergency pause is active")
                     risk_score += 100
-                else:
-                    self._reset_circuit_breaker()
+
+                if gate_flags & _GATE_CIRCUIT:
+                    if probe:
+                        # Cooldown elapsed - this trade probes the market; its recorded
+                        # result closes the breaker or re-opens it
+                        warnings.append("Circuit breaker half-open (probe trade)")
+                        risk_score += 10
+                    elif self._cb_state == CB_OPEN:
+                        blockers.append(f"Circuit breaker active until {self.circuit_breaker_until}")
+                        risk_score += 100
+                    else:
+                        blockers.append("Circuit breaker half-open - probe trade already in flight")
+                        risk_score += 100
+
+            # Opportunities blocked moments ago are rejected without re-running the checks
+            fingerprint = None
+            if not blockers:
+                fingerprint = self._opportunity_fingerprint(opportunity)
+                recent = self._recent_block(fingerprint)
+                if recent is not None:
+                    # Still an assessment - count it, just skip the checks and the logging
+                    self.cached_rejections += 1
+                    self._record_assessment(recent)
+                    return recent
 
             # 2. Rate Limiting Check
-            current_time = time.time()
-            if current_time - self.last_trade_time < self.min_trade_interval:
-                remaining = self.min_trade_interval - (current_time - self.last_trade_time)
+            tokens = self._refill_trade_bucket()
+            if tokens < 1.0:
+                remaining = (1.0 - tokens) / self._bucket_rate
                 warnings.append(f"Rate limit: {remaining:.1f}s remaining")
                 risk_score += 20
 
-            # 3. Position Size Validation - CORRECTED
-            if amount_in_usd > self.max_position_size_usd:
-                blockers.append(f"Position size ${amount_in_usd:.2f} exceeds limit ${self.max_position_size_usd}")
-                risk_score += 50
-            elif amount_in_usd > self.max_position_size_usd * Decimal("0.8"):
-                warnings.append("Position size near limit")
-                risk_score += 15
-
             # 4. Daily Volume Check - CORRECTED
             self._reset_daily_limits_if_needed()
-            if self.daily_volume_usd + amount_in_usd > self.daily_volume_limit_usd:
-                remaining_capacity = self.daily_volume_limit_usd - self.daily_volume_usd
-                if remaining_capacity <= 0:
+            projected_volume_cents = self.daily_volume_cents + _usdc_wei_to_cents(opportunity.get('amount_in', 0))
+            if projected_volume_cents > self.daily_volume_limit_cents:
+                remaining_capacity_cents = self.daily_volume_limit_cents - self.daily_volume_cents
+                if remaining_capacity_cents <= 0:
                     blockers.append(
-                        f"Daily volume limit exceeded (${self.daily_volume_usd:.2f}/${self.daily_volume_limit_usd})")
+                        f"Daily volume limit exceeded "
+                        f"(${self.daily_volume_cents / 100:.2f}/${_format_usd_limit(self.daily_volume_limit_usd)})")
                     risk_score += 50
                 else:
-                    warnings.append(f"Limited daily capacity remaining: ${remaining_capacity:.2f}")
+                    warnings.append(f"Limited daily capacity remaining: ${remaining_capacity_cents / 100:.2f}")
                     risk_score += 10
-            elif self.daily_volume_usd + amount_in_usd > self.daily_volume_limit_usd * Decimal("0.8"):
+            elif projected_volume_cents > self._volume_warn_cents:
                 warnings.append("Approaching daily volume limit")
                 risk_score += 10
 
-            # 5. Profitability Analysis - CORRECTED
-            if expected_profit_usd < self.min_profit_threshold_usd:
-                blockers.append(f"Profit ${expected_profit_usd:.2f} below threshold ${self.min_profit_threshold_usd}")
-                risk_score += 30
-            elif expected_profit_usd < self.min_profit_threshold_usd * Decimal("1.5"):
-                warnings.append("Profit margin is low")
-                risk_score += 10
-
-            # 6. Slippage Validation
-            if slippage > self.max_slippage_tolerance:
-                blockers.append(f"Slippage {slippage:.2%} exceeds tolerance {self.max_slippage_tolerance:.2%}")
-                risk_score += 40
-            elif slippage > self.max_slippage_tolerance * Decimal("0.7"):
-                warnings.append("High slippage detected")
-                risk_score += 15
-
-            # 7. Gas Cost Analysis - CORRECTED
+            # Gas cost ratio for check 7 - CORRECTED
             if expected_profit_usd > 0:
                 gas_ratio = gas_cost_usd / expected_profit_usd
             else:
-                gas_ratio = Decimal("999")
-
-            if gas_ratio > self.gas_cost_max_ratio:
-                blockers.append(
-                    f"Gas cost ratio {gas_ratio:.2%} too high (${gas_cost_usd:.3f} gas vs ${expected_profit_usd:.2f} profit)")
-                risk_score += 35
-            elif gas_ratio > self.gas_cost_max_ratio * Decimal("0.7"):
-                warnings.append("Gas cost is significant portion of profit")
-                risk_score += 12
+                gas_ratio = 999.0
+
+            # 3, 5, 6, 7. Position size, profitability, slippage and gas cost thresholds
+            values = {
+                'amount_in_usd': amount_in_usd,
+                'expected_profit_usd': expected_profit_usd,
+                'slippage': slippage,
+                'gas_ratio': gas_ratio,
+                'gas_cost_usd': gas_cost_usd,
+            }
+            for (name, sign, signed_limit, signed_warn, limit, block_weight, warn_weight,
+                 blocker, warning) in self._threshold_checks:
+                value = values[name] * sign
+                if value > signed_limit:
+                    blockers.append(blocker.format(limit=limit, limit_usd=_format_usd_limit(limit), **values))
+                    risk_score += block_weight
+                elif value > signed_warn:
+                    warnings.append(warning)
+                    risk_score += warn_weight
+
+            # Any blocker from the synchronous checks above decides the outcome -
+            # reject before paying for the RPC-bound checks below
+            if blockers:
+                assessment = self._finalize_assessment(
+                    opportunity, risk_score, warnings, blockers, expected_profit_usd,
+                    slippage, gas_ratio, self.network_health_score, 0.0)
+                self._remember_block(fingerprint, assessment)
+                return assessment
+
+            # 8-10. Network, token pair and liquidity checks are independent - run them concurrently
+            try:
+                network_score, pair_supported, liquidity_score = await asyncio.wait_for(
+                    asyncio.gather(
+                        self._assess_network_health(),
+                        self._validate_token_pair(token_in, token_out),
+                        self._assess_liquidity(token_in, token_out, amount_in_usd)
+                    ),
+                    timeout=self.async_checks_timeout
+                )
+            except asyncio.TimeoutError:
+                blockers.append(f"Risk checks timed out after {self.async_checks_timeout}s")
+                risk_score += 50
+                return self._finalize_assessment(
+                    opportunity, risk_score, warnings, blockers, expected_profit_usd,
+                    slippage, gas_ratio, self.network_health_score, 0.0)
 
             # 8. Network Health Check - FIXED FOR POLYGON POA
-            network_score = await self._assess_network_health()
             if network_score < 0.6:
                 warnings.append(f"Network health degraded: {network_score:.2f}")
                 risk_score += 10
@@ -216,12 +504,11 @@ class RiskManager:
                 risk_score += 5
 
             # 9. Token Pair Validation
-            if not await self._validate_token_pair(token_in, token_out):
+            if not pair_supported:
                 blockers.append("Invalid or unsupported token pair")
                 risk_score += 50
 
             # 10. Liquidity Assessment - SIMPLIFIED FOR TESTING
-            liquidity_score = await self._assess_liquidity(token_in, token_out, amount_in_usd)
             if liquidity_score < 0.3:
                 blockers.append(f"Insufficient liquidity: {liquidity_score:.2f}")
                 risk_score += 30
@@ -229,39 +516,10 @@ class RiskManager:
                 warnings.append(f"Limited liquidity: {liquidity_score:.2f}")
                 risk_score += 10
 
-            # Calculate final risk metrics
-            metrics = RiskMetrics(
-                profit_threshold_usd=expected_profit_usd,
-                max_slippage=slippage,
-                min_liquidity=int(liquidity_score * 100),
-                gas_cost_ratio=gas_ratio,
-                network_congestion=1.0 - network_score,
-                price_impact=slippage,
-                execution_time_limit=60,
-                confidence_score=max(0, 1.0 - (risk_score / 100))
-            )
-
-            # Determine if trade is safe
-            is_safe = len(blockers) == 0 and risk_score < 50
-
-            # Create risk assessment
-            assessment = TradeRisk(
-                is_safe=is_safe,
-                risk_score=min(100, risk_score),
-                warnings=warnings,
-                blockers=blockers,
-                metrics=metrics,
-                timestamp=time.time()
-            )
-
-            # Store assessment
-            self.risk_assessments.append(assessment)
-            if len(self.risk_assessments) > 100:
-                self.risk_assessments = self.risk_assessments[-50:]  # Keep last 50
-
-            # Log assessment
-            self._log_risk_assessment(assessment, opportunity)
-
+            assessment = self._finalize_assessment(
+                opportunity, risk_score, warnings, blockers, expected_profit_usd,
+                slippage, gas_ratio, network_score, liquidity_score)
+            self._remember_block(fingerprint, assessment)
             return assessment
 
         except Exception as e:
@@ -272,35 +530,119 @@ class RiskManager:
                 warnings=[],
                 blockers=[f"Risk assessment error: {str(e)}"],
                 metrics=RiskMetrics(
-                    profit_threshold_usd=Decimal("0"),
-                    max_slippage=Decimal("1"),
+                    profit_threshold_usd=_D_ZERO,
+                    max_slippage=_D_ONE,
                     min_liquidity=0,
-                    gas_cost_ratio=Decimal("999"),
+                    gas_cost_ratio=_D_999,
                     network_congestion=1.0,
-                    price_impact=Decimal("1"),
+                    price_impact=_D_ONE,
                     execution_time_limit=0,
                     confidence_score=0.0
                 ),
                 timestamp=time.time()
             )
 
+    def _finalize_assessment(self, opportunity: Dict, risk_score: float, warnings: List[str],
+                             blockers: List[str], expected_profit_usd: float, slippage: float,
+                             gas_ratio: float, network_score: float, liquidity_score: float) -> TradeRisk:
+        """Build, store and log the final trade risk assessment"""
+        # Calculate final risk metrics - Decimal only at this storage boundary
+        slippage_decimal = Decimal(str(slippage))
+        metrics = RiskMetrics(
+            profit_threshold_usd=Decimal(str(expected_profit_usd)),
+            max_slippage=slippage_decimal,
+            min_liquidity=int(liquidity_score * 100),
+            gas_cost_ratio=Decimal(str(gas_ratio)),
+            network_congestion=1.0 - network_score,
+            price_impact=slippage_decimal,
+            execution_time_limit=60,
+            confidence_score=max(0, 1.0 - (risk_score / 100))
+        )
+
+        # Determine if trade is safe
+        is_safe = len(blockers) == 0 and risk_score < 50
+
+        # Create risk assessment
+        assessment = TradeRisk(
+            is_safe=is_safe,
+            risk_score=min(100, risk_score),
+            warnings=warnings,
+            blockers=blockers,
+            metrics=metrics,
+            timestamp=time.time()
+        )
+
+        self._record_assessment(assessment)
+
+        # Log assessment
+        self._log_risk_assessment(assessment, opportunity)
+
+        return assessment
+
+    def _record_assessment(self, assessment: TradeRisk):
+        """Store an assessment in the history and the running risk score aggregates"""
+        if len(self._recent_risk_scores) == self.risk_assessments.maxlen:
+            self._recent_risk_sum -= self._recent_risk_scores.popleft()[1]
+        self._recent_risk_scores.append((time.monotonic(), assessment.risk_score))
+        self._recent_risk_sum += assessment.risk_score
+        self.risk_assessments.append(assessment)
+
+    @staticmethod
+    def _opportunity_fingerprint(opportunity: Dict) -> bytes:
+        """Short digest of the opportunity fields that determine its blockers"""
+        key = "|".join(str(opportunity.get(field, '')) for field in _FINGERPRINT_FIELDS)
+        return hashlib.blake2b(key.encode(), digest_size=16).digest()
+
+    def _recent_block(self, fingerprint: bytes) -> Optional[TradeRisk]:
+        """Return a copy of a still-fresh blocked assessment for this fingerprint"""
+        entry = self._recent_blocks.get(fingerprint)
+        if entry is None:
+            return None
+
+        expires, blocked = entry
+        if time.monotonic() >= expires:
+            del self._recent_blocks[fingerprint]
+            return None
+
+        self._recent_blocks.move_to_end(fingerprint)
+        return TradeRisk(
+            is_safe=False,
+            risk_score=blocked.risk_score,
+            warnings=list(blocked.warnings),
+            blockers=list(blocked.blockers),
+            metrics=blocked.metrics,
+            timestamp=time.time()
+        )
+
+    def _remember_block(self, fingerprint: Optional[bytes], assessment: TradeRisk):
+        """Remember a blocked assessment so identical repeats short-circuit"""
+        if fingerprint is None or not assessment.blockers:
+            return
+
+        self._recent_blocks[fingerprint] = (time.monotonic() + self.recent_block_ttl, assessment)
+        self._recent_blocks.move_to_end(fingerprint)
+        if len(self._recent_blocks) > self.recent_block_max_size:
+            self._recent_blocks.popitem(last=False)
+
     def _log_risk_assessment(self, assessment: TradeRisk, opportunity: Dict):
         """Log risk assessment results"""
-        status = "✅ SAFE" if assessment.is_safe else "🚫 BLOCKED"
-        logger.info(f"{status} Risk Score: {assessment.risk_score:.1f}/100")
+        info_enabled = logger.isEnabledFor(logging.INFO)
+        if info_enabled:
+            status = "✅ SAFE" if assessment.is_safe else "🚫 BLOCKED"
+            logger.info("%s Risk Score: %.1f/100", status, assessment.risk_score)
 
         if assessment.warnings:
-            logger.warning(f"⚠️ Warnings: {', '.join(assessment.warnings)}")
+            logger.warning("⚠️ Warnings: %s", ', '.join(assessment.warnings))
 
         if assessment.blockers:
-            logger.error(f"🚫 Blockers: {', '.join(assessment.blockers)}")
+            logger.error("🚫 Blockers: %s", ', '.join(assessment.blockers))
 
-        # Log key metrics
-        m = assessment.metrics
-        logger.info(f"📊 Metrics - Profit: ${m.profit_threshold_usd:.2f}, "
-                    f"Slippage: {m.max_slippage:.2%}, "
-                    f"Gas Ratio: {m.gas_cost_ratio:.2%}, "
-                    f"Confidence: {m.confidence_score:.2%}")
+        # Log key metrics - Decimals converted to float once for formatting, only if emitted
+        if info_enabled:
+            m = assessment.metrics
+            logger.info("📊 Metrics - Profit: $%.2f, Slippage: %.2f%%, Gas Ratio: %.2f%%, Confidence: %.2f%%",
+                        float(m.profit_threshold_usd), float(m.max_slippage) * 100,
+                        float(m.gas_cost_ratio) * 100, m.confidence_score * 100)
 
     async def record_trade_result(self, opportunity: Dict, success: bool, profit: Optional[Decimal] = None,
                                   error: Optional[str] = None):
@@ -318,67 +660,85 @@ class RiskManager:
             if success:
                 self.consecutive_failures = 0
                 if profit:
-                    amount_usd = Decimal(str(opportunity.get('amount_in', 0))) / Decimal("1e6")
-                    self.daily_volume_usd += amount_usd
+                    self.daily_volume_cents += _usdc_wei_to_cents(opportunity.get('amount_in', 0))
+
+                # Successful probe closes the circuit breaker
+                if self._cb_state == CB_HALF_OPEN:
+                    await self._reset_circuit_breaker()
             else:
                 self.consecutive_failures += 1
 
-                # Trigger circuit breaker if too many failures
-                if self.consecutive_failures >= self.max_consecutive_failures:
+                # Trigger circuit breaker if too many failures or the probe failed
+                if (self._cb_state == CB_HALF_OPEN or
+                        self.consecutive_failures >= self.max_consecutive_failures):
                     await self._activate_circuit_breaker()
 
             # Record trade history
-            trade_record = {
-                'timestamp': time.time(),
-                'opportunity': opportunity,
-                'success': success,
-                'profit': str(profit) if profit else None,
-                'error': error,
-                'consecutive_failures': self.consecutive_failures
-            }
+            trade_record = TradeRecord(time.time(), opportunity, success, profit or None, error,
+                                       self.consecutive_failures)
 
+            if len(self.trade_history) == self.trade_history.maxlen and self.trade_history[0].success:
+                self._successful_trades -= 1  # Oldest record is about to be evicted
+            if success:
+                self._successful_trades += 1
             self.trade_history.append(trade_record)
-            if len(self.trade_history) > 1000:
-                self.trade_history = self.trade_history[-500:]  # Keep last 500
 
             # Update last trade time if successful
             if success:
                 self.last_trade_time = time.time()
+                self._refill_trade_bucket()
+                self._bucket_tokens = max(0.0, self._bucket_tokens - 1.0)
 
-            logger.info(f"📝 Trade recorded: {'SUCCESS' if success else 'FAILURE'} "
-                        f"(Consecutive failures: {self.consecutive_failures})")
+            logger.info("📝 Trade recorded: %s (Consecutive failures: %d)",
+                        'SUCCESS' if success else 'FAILURE', self.consecutive_failures)
 
         except Exception as e:
             logger.error(f"❌ Failed to record trade result: {e}")
 
     async def _activate_circuit_breaker(self):
-        """Activate circuit breaker after consecutive failures"""
-        self.circuit_breaker_active = True
-        self.circuit_breaker_until = datetime.now() + timedelta(minutes=30)
+        """Open circuit breaker after consecutive failures or a failed probe"""
+        async with self._cb_lock:
+            self._set_cb_state(CB_OPEN)
+            self._cb_until_mono = time.monotonic() + self.circuit_breaker_cooldown
 
         logger.error(f"🔴 CIRCUIT BREAKER ACTIVATED! "
                      f"Too many failures ({self.consecutive_failures}). "
                      f"Trading paused until {self.circuit_breaker_until}")
 
-    def _reset_circuit_breaker(self):
-        """Reset circuit breaker"""
-        self.circuit_breaker_active = False
-        self.circuit_breaker_until = None
+    async def _reset_circuit_breaker(self):
+        """Close circuit breaker after a successful probe"""
+        async with self._cb_lock:
+            if not self._cb_compare_and_set(CB_HALF_OPEN, CB_CLOSED):
+                return
+            self._cb_until_mono = None
         logger.info("🟢 Circuit breaker reset - Trading resumed")
 
+    def _refill_trade_bucket(self) -> float:
+        """Top up the trade token bucket for the time elapsed and return the tokens available"""
+        now = time.monotonic()
+        self._bucket_tokens = min(self._bucket_capacity,
+                                  self._bucket_tokens + (now - self._bucket_last_refill) * self._bucket_rate)
+        self._bucket_last_refill = now
+        return self._bucket_tokens
+
     def _reset_daily_limits_if_needed(self):
-        """Reset daily volume limits if new day"""
-        current_date = datetime.now().date()
-        if current_date > self.last_reset_date:
-            self.daily_volume_usd = Decimal("0")
-            self.last_reset_date = current_date
+        """Reset daily volume limits if new day (UTC)"""
+        day = int(time.time() // 86400)
+        if day != self._last_reset_day:
+            self.daily_volume_cents = 0
+            self._last_reset_day = day
             logger.info("🔄 Daily limits reset")
 
     async def _assess_network_health(self) -> float:
         """Assess network health with proper POA support for Polygon"""
+        if time.monotonic() - self._network_health_mono < self.network_health_ttl:
+            return self.network_health_score
+
+        # The Web3 provider is synchronous - run its RPC calls off the event loop
+        loop = asyncio.get_running_loop()
         try:
             # Check latest block
-            latest_block = self.web3.eth.get_block('latest')
+            latest_block = await loop.run_in_executor(None, self.web3.eth.get_block, 'latest')
             current_time = time.time()
             block_age = current_time - latest_block.timestamp
 
@@ -393,7 +753,7 @@ class RiskManager:
 
             # Gas price analysis (very high gas = network congestion)
             try:
-                gas_price = self.web3.eth.gas_price
+                gas_price = await loop.run_in_executor(None, lambda: self.web3.eth.gas_price)
                 gas_price_gwei = gas_price / 1e9
 
                 if gas_price_gwei > 200:  # > 200 gwei (very high for Polygon)
@@ -401,72 +761,69 @@ class RiskManager:
                 elif gas_price_gwei > 100:  # > 100 gwei
                     health_score -= 0.15
 
-                logger.debug(f"Network: Block age {block_age:.1f}s, Gas {gas_price_gwei:.1f} gwei")
+                logger.debug("Network: Block age %.1fs, Gas %.1f gwei", block_age, gas_price_gwei)
 
             except Exception as e:
                 logger.debug(f"Gas price check failed: {e}")
                 health_score -= 0.1
 
             self.network_health_score = max(0.5, health_score)  # Minimum 0.5 for Polygon POA
+            self._network_health_mono = time.monotonic()
             return self.network_health_score
 
         except Exception as e:
             logger.debug(f"Network health check failed: {e}")
             return 0.8  # Default good score for Polygon
 
+    def _check_cache_get(self, cache: Dict, key: Tuple) -> Any:
+        """Return a cached check result, or None if missing or older than check_cache_ttl"""
+        entry = cache.get(key)
+        if entry is not None and time.monotonic() - entry[0] < self.check_cache_ttl:
+            return entry[1]
+        return None
+
+    def _check_cache_put(self, cache: Dict, key: Tuple, value: Any):
+        """Store a check result, dropping everything once the cache grows too large"""
+        if len(cache) >= self.check_cache_max_size:
+            cache.clear()
+        cache[key] = (time.monotonic(), value)
+
     async def _validate_token_pair(self, token_in: str, token_out: str) -> bool:
-        """Validate token pair is supported and safe"""
+        """Validate a canonical (see _canonical_addr) token pair is supported and safe"""
         try:
             # Basic validation
             if not token_in or not token_out:
                 return False
 
-            # Check if tokens are valid addresses
-            if not Web3.is_address(token_in) or not Web3.is_address(token_out):
-                return False
-
-            # Major Polygon tokens - EXPANDED LIST
-            major_tokens = [
-                '0x2791bca1f2de4661ed88a30c99a7a9449aa84174',  # USDC
-                '0xc2132d05d31c914a87c6611c10748aeb04b58e8f',  # USDT
-                '0x8f3cf7ad23cd3cadbd9735aff958023239c6a063',  # DAI
-                '0x0d500b1d8e8ef31e21c99d1db9a6444d3adf1270',  # WMATIC
-                '0x7ceb23fd6bc0add59e62ac25578270cff1b9f619',  # WETH
-                '0x1bfd67037b42cf73acf2047067bd4f2c47d9bfd6',  # WBTC
-                '0x53e0bca35ec356bd5dddfebbd1fc0fd03fabad39',  # LINK
-                '0xd6df932a45c0f255f85145f286ea0b292b21c90b',  # AAVE
-            ]
-
-            # Convert to lowercase for comparison
-            token_in_lower = token_in.lower()
-            token_out_lower = token_out.lower()
-
-            # Both tokens must be in our supported list
-            if (token_in_lower in major_tokens and token_out_lower in major_tokens):
-                logger.debug(f"✅ Token pair validated: {token_in[:8]}.../{token_out[:8]}...")
-                return True
-
-            logger.debug(f"❌ Unsupported token pair: {token_in[:8]}.../{token_out[:8]}...")
-            return False
+            return _validate_token_pair_cached(token_in, token_out)
 
         except Exception as e:
             logger.warning(f"⚠️ Token validation failed: {e}")
             return False
 
-    async def _assess_liquidity(self, token_in: str, token_out: str, amount_usd: Decimal) -> float:
-        """Assess liquidity for token pair and amount"""
+    async def _assess_liquidity(self, token_in: str, token_out: str, amount_usd: float) -> float:
+        """Assess liquidity for a canonical token pair and amount (cached per pair and $1k amount bucket)"""
+        try:
+            # Score thresholds sit on $1k boundaries, so bucketing by $1k never changes the result
+            key = (token_in, token_out, int(amount_usd // 1000))
+            score = self._check_cache_get(self._liquidity_cache, key)
+            if score is None:
+                score = self._score_liquidity(token_in, token_out, amount_usd)
+                self._check_cache_put(self._liquidity_cache, key, score)
+            return score
+
+        except Exception as e:
+            logger.warning(f"⚠️ Liquidity assessment failed: {e}")
+            return 0.1
+
+    def _score_liquidity(self, token_in: str, token_out: str, amount_usd: float) -> float:
+        """Uncached liquidity score for a lowercased token pair and amount"""
         try:
             # Simplified liquidity assessment for major pairs
-            major_tokens = [
-                '0x2791bca1f2de4661ed88a30c99a7a9449aa84174',  # USDC
-                '0x0d500b1d8e8ef31e21c99d1db9a6444d3adf1270',  # WMATIC
-                '0x7ceb23fd6bc0add59e62ac25578270cff1b9f619',  # WETH
-            ]
-
-            if (token_in.lower() in major_tokens and token_out.lower() in major_tokens):
-                if amount_usd < Decimal("1000"):  # < $1k
+            if token_in in _DEEP_LIQUIDITY_TOKENS and token_out in _DEEP_LIQUIDITY_TOKENS:
+                if amount_usd < 1000:  # < $1k
                     return 0.9
-                elif amount_usd < Decimal("5000"):  # < $5k
+                elif amount_usd < 5000:  # < $5k
                     return 0.7
                 else:
                     return 0.5
@@ -491,16 +848,19 @@ class RiskManager:
 
     def get_risk_status(self) -> Dict:
         """Get current risk management status"""
+        cb_until = self.circuit_breaker_until
         return {
             'emergency_pause': self.emergency_pause,
             'circuit_breaker_active': self.circuit_breaker_active,
-            'circuit_breaker_until': self.circuit_breaker_until.isoformat() if self.circuit_breaker_until else None,
+            'circuit_breaker_state': _CB_STATE_NAMES[self._cb_state],
+            'circuit_breaker_until': cb_until.isoformat() if cb_until else None,
             'consecutive_failures': self.consecutive_failures,
             'daily_volume_usd': str(self.daily_volume_usd),
-            'daily_volume_limit_usd': str(self.daily_volume_limit_usd),
+            'daily_volume_limit_usd': _format_usd_limit(self.daily_volume_limit_usd),
             'network_health_score': self.network_health_score,
             'last_trade_time': self.last_trade_time,
             'total_assessments': len(self.risk_assessments),
+            'cached_rejections': self.cached_rejections,
             'total_trades': len(self.trade_history)
         }
 
@@ -510,13 +870,15 @@ class RiskManager:
             return {'total_trades': 0, 'success_rate': 0, 'message': 'No trades recorded'}
 
         # Calculate success rate
-        successful_trades = sum(1 for trade in self.trade_history if trade['success'])
+        successful_trades = self._successful_trades
         success_rate = successful_trades / len(self.trade_history)
 
-        # Calculate risk scores
-        recent_assessments = [a for a in self.risk_assessments if time.time() - a.timestamp < 3600]  # Last hour
-        avg_risk_score = sum(a.risk_score for a in recent_assessments) / len(
-            recent_assessments) if recent_assessments else 0
+        # Calculate risk scores - drop assessments older than an hour
+        recent_scores = self._recent_risk_scores
+        cutoff = time.monotonic() - 3600
+        while recent_scores and recent_scores[0][0] <= cutoff:
+            self._recent_risk_sum -= recent_scores.popleft()[1]
+        avg_risk_score = self._recent_risk_sum / len(recent_scores) if recent_scores else 0
 
         return {
             'total_trades': len(self.trade_history),
@@ -525,5 +887,5 @@ class RiskManager:
             'avg_risk_score': avg_risk_score,
             'network_health': self.network_health_score,
             'daily_volume_used_usd': str(self.daily_volume_usd),
-            'daily_volume_remaining_usd': str(self.daily_volume_limit_usd - self.daily_volume_usd)
+            'daily_volume_remaining_usd': str(Decimal(self.daily_volume_limit_cents - self.daily_volume_cents) / 100)
         }
\ No newline at end of file
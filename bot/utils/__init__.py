@@ -13,23 +13,40 @@ Usage:
     from bot.utils.notifications import send_alert
 """
 
+import importlib
+
 from .logger import get_logger, setup_logging
-from .helpers import (
-    format_wei,
-    wei_to_ether,
-    ether_to_wei,
-    calculate_gas_price,
-    validate_address,
-    get_current_timestamp,
-    calculate_percentage_difference,
-    format_currency
-)
-from .notifications import (
-    NotificationManager,
-    send_discord_alert,
-    send_telegram_alert,
-    send_slack_alert
-)
+
+# Helpers and notifications pull in requests/aiohttp/web3, so they are
+# imported on first attribute access (PEP 562) rather than with the package
+_LAZY = {
+    "format_wei": "helpers",
+    "wei_to_ether": "helpers",
+    "ether_to_wei": "helpers",
+    "calculate_gas_price": "helpers",
+    "validate_address": "helpers",
+    "get_current_timestamp": "helpers",
+    "calculate_percentage_difference": "helpers",
+    "format_currency": "helpers",
+    "NotificationManager": "notifications",
+    "send_discord_alert": "notifications",
+    "send_telegram_alert": "notifications",
+    "send_slack_alert": "notifications",
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value  # Cache so later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
+
 
 __version__ = "1.0.0"
 __all__ = [
@@ -0,0 +1,145 @@
+# bot/utils/batch_math.py
+"""
+Vectorized arbitrage math for scoring many candidates at once.
+
+Kept apart from helpers.py because NumPy (and Numba, when installed) are slow
+to import; modules that only need the scalar helpers never load them.
+
+Usage:
+    from bot.utils.batch_math import calculate_arbitrage_profits_batch
+
+    results = calculate_arbitrage_profits_batch(amounts_wei, buy_prices, sell_prices)
+"""
+
+from typing import Dict, Union
+
+import numpy as np
+
+from .helpers import WEI_PER_ETHER
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:  # Optional - the batch profit estimator falls back to NumPy
+    NUMBA_AVAILABLE = False
+
+__all__ = [
+    "NUMBA_AVAILABLE",
+    "calculate_arbitrage_profits_batch",
+    "calculate_percentage_difference_batch",
+]
+
+
+def calculate_arbitrage_profits_batch(
+        amount_in: np.ndarray,
+        price_buy: np.ndarray,
+        price_sell: np.ndarray,
+        gas_cost: Union[np.ndarray, int] = 0,
+        decimals: int = 18
+) -> Dict[str, np.ndarray]:
+    """
+    Vectorized calculate_arbitrage_profit for scoring many candidates at once.
+
+    Works in float64 like calculate_arbitrage_profit, but wei amounts are
+    rounded to float64 before scaling, so the last digit can differ;
+    re-check the chosen trade with calculate_arbitrage_profit.
+
+    Args:
+        amount_in: Input amounts in wei
+        price_buy: Buy prices per token
+        price_sell: Sell prices per token
+        gas_cost: Estimated gas costs in wei (array or scalar)
+        decimals: Token decimals
+
+    Returns:
+        Dictionary of arrays with the same keys as calculate_arbitrage_profit
+    """
+    # Broadcast to one flat float64 column per input
+    columns = np.broadcast_arrays(
+        *(np.asarray(a, dtype=np.float64) for a in (amount_in, price_buy, price_sell, gas_cost)))
+    shape = columns[0].shape
+    amount_wei, buy, sell, gas_wei = (np.ascontiguousarray(c).ravel() for c in columns)
+
+    kernel = _profit_kernel if NUMBA_AVAILABLE else _profit_numpy
+    amount, tokens_bought, revenue, gross_profit, gas, net_profit, profit_percentage, price_difference = (
+        out.reshape(shape) for out in
+        kernel(amount_wei, buy, sell, gas_wei, 1.0 / 10 ** decimals, 1.0 / WEI_PER_ETHER))
+
+    return {
+        "amount_in": amount,
+        "tokens_bought": tokens_bought,
+        "revenue": revenue,
+        "gross_profit": gross_profit,
+        "gas_cost": gas,
+        "net_profit": net_profit,
+        "profit_percentage": profit_percentage,
+        "price_difference": price_difference,
+        "is_profitable": net_profit > 0
+    }
+
+
+def calculate_percentage_difference_batch(price1: np.ndarray, price2: np.ndarray) -> np.ndarray:
+    """
+    Vectorized calculate_percentage_difference.
+
+    Args:
+        price1: First prices (typically lower)
+        price2: Second prices (typically higher)
+
+    Returns:
+        Array of percentage differences; 0 wherever either price is 0
+    """
+    p1 = np.asarray(price1, dtype=np.float64)
+    p2 = np.asarray(price2, dtype=np.float64)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where((p1 != 0) & (p2 != 0), (p2 - p1) / p1 * 100, 0.0)
+
+
+def _profit_numpy(amount_wei, buy, sell, gas_wei, inv_dec, inv_gas_dec):
+    """NumPy implementation of the batch profit kernel"""
+    amount = amount_wei * inv_dec
+    gas = gas_wei * inv_gas_dec  # Gas always in MATIC
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tokens_bought = np.where(buy > 0, amount / buy, 0.0)
+        revenue = tokens_bought * sell
+        gross_profit = revenue - amount
+        net_profit = gross_profit - gas
+        profit_percentage = np.where(amount > 0, net_profit / amount * 100, 0.0)
+        price_difference = np.where((buy != 0) & (sell != 0), (sell - buy) / buy * 100, 0.0)
+
+    return amount, tokens_bought, revenue, gross_profit, gas, net_profit, profit_percentage, price_difference
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _profit_kernel(amount_wei, buy, sell, gas_wei, inv_dec, inv_gas_dec):
+        """Fused single-pass batch profit kernel, parallel across cores"""
+        n = amount_wei.shape[0]
+        amount = np.empty(n)
+        tokens_bought = np.empty(n)
+        revenue = np.empty(n)
+        gross_profit = np.empty(n)
+        gas = np.empty(n)
+        net_profit = np.empty(n)
+        profit_percentage = np.empty(n)
+        price_difference = np.empty(n)
+
+        for i in prange(n):
+            amt = amount_wei[i] * inv_dec
+            tokens = amt / buy[i] if buy[i] > 0 else 0.0
+            rev = tokens * sell[i]
+            gross = rev - amt
+            net = gross - gas_wei[i] * inv_gas_dec
+
+            amount[i] = amt
+            tokens_bought[i] = tokens
+            revenue[i] = rev
+            gross_profit[i] = gross
+            gas[i] = gas_wei[i] * inv_gas_dec
+            net_profit[i] = net
+            profit_percentage[i] = net / amt * 100 if amt > 0 else 0.0
+            price_difference[i] = (sell[i] - buy[i]) / buy[i] * 100 if buy[i] != 0 and sell[i] != 0 else 0.0
+
+        return amount, tokens_bought, revenue, gross_profit, gas, net_profit, profit_percentage, price_difference
@@ -17,14 +17,98 @@ Usage:
     gas_price = calculate_gas_price(speed="fast")
 """
 
+import asyncio
 import time
+import random
 import re
-from decimal import Decimal, getcontext
-from typing import Union, Optional, Dict, Any, List
+import json
+import hashlib
+import logging
+import threading
+import weakref
+from bisect import bisect_right
+from decimal import Decimal, getcontext, ROUND_HALF_UP
+from functools import lru_cache, wraps
+from typing import Union, Optional, Dict, Any, List, Tuple, Iterator
 from datetime import datetime, timezone
+from enum import Enum
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from web3 import Web3
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:  # Optional - save_json_file falls back to the stdlib json module
+    ORJSON_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "WEI_PER_ETHER",
+    "GWEI_PER_ETH",
+    "SECONDS_PER_MINUTE",
+    "SECONDS_PER_HOUR",
+    "SECONDS_PER_DAY",
+    "ORJSON_AVAILABLE",
+    "NUMBA_AVAILABLE",
+    "format_wei",
+    "wei_to_ether",
+    "ether_to_wei",
+    "calculate_gas_price",
+    "validate_address",
+    "get_current_timestamp",
+    "get_current_datetime",
+    "calculate_percentage_difference",
+    "calculate_arbitrage_profit",
+    "calculate_arbitrage_profits_batch",
+    "calculate_percentage_difference_batch",
+    "format_currency",
+    "format_percentage",
+    "chunks",
+    "retry_with_backoff",
+    "is_contract_address",
+    "are_contract_addresses",
+    "calculate_slippage_amount",
+    "seconds_until_next_minute",
+    "seconds_until_next_hour",
+    "format_duration",
+    "format_amount",
+    "parse_amount",
+    "calculate_slippage",
+    "calculate_gas_cost",
+    "estimate_profit",
+    "to_checksum_address",
+    "create_trade_hash",
+    "retry_on_failure",
+    "safe_divide",
+    "get_percentage_change",
+    "truncate_address",
+    "validate_private_key",
+    "load_json_file",
+    "save_json_file",
+    "is_profitable_after_gas",
+    "timestamp_to_datetime",
+    "datetime_to_timestamp",
+    "RateLimiter",
+    "calculate_profit_percentage",
+    "get_token_decimals",
+]
+
+# The batch estimators need NumPy (and Numba, if installed), which are slow to
+# import; they live in batch_math and load on first attribute access (PEP 562)
+_BATCH_MATH = ("NUMBA_AVAILABLE", "calculate_arbitrage_profits_batch", "calculate_percentage_difference_batch")
+
+
+def __getattr__(name):
+    if name not in _BATCH_MATH:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from . import batch_math
+    value = getattr(batch_math, name)
+    globals()[name] = value  # Cache so later lookups skip __getattr__
+    return value
+
 # Set high precision for decimal calculations
 getcontext().prec = 50
 
@@ -35,6 +119,75 @@ SECONDS_PER_MINUTE = 60
 SECONDS_PER_HOUR = 3600
 SECONDS_PER_DAY = 86400
 
+# Decimal constants - parsed once at import
+_DEC_ONE = Decimal(1)
+_DEC_100 = Decimal(100)
+
+# Errors retry_with_backoff treats as transient by default
+_TRANSIENT_ERRORS = (requests.exceptions.RequestException, ConnectionError, TimeoutError, asyncio.TimeoutError)
+
+# Hex address format: 0x followed by 40 hex digits, either case
+_ADDR_RE = re.compile(r'^0x[0-9a-f]{40}$', re.IGNORECASE)
+
+# Shared HTTP session - keep-alive connections avoid a TCP/TLS handshake per request
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=Retry(total=0)))
+
+# Last gas station response, shared by all callers of calculate_gas_price
+_GAS_CACHE: Dict[str, Any] = {"ts": float("-inf"), "url": None, "data": None, "etag": None}
+_GAS_CACHE_LOCK = threading.Lock()
+
+# On a failed refetch the last response is still used for up to this many TTLs
+_GAS_MAX_STALE_TTLS = 10
+
+
+# Slippage is applied in integer millionths of the amount on the fast path
+_SLIPPAGE_PPM_SCALE = 1_000_000
+
+# format_wei precision tiers: below 0.01, below 1, below 1000, and the rest
+# Note: the tiers start at exactly 0.01 - the old `amount >= 0.01` compared against the
+# binary float 0.01 (slightly above 0.01), so an amount of exactly 0.01 used to get 8 places
+_FORMAT_THRESHOLDS = (Decimal("0.01"), _DEC_ONE, Decimal(1000))
+_FORMAT_BUCKETS = ("{:.8f}", "{:.6f}", "{:.4f}", "{:,.2f}")
+
+# Integer scale factors for the common token decimals
+_POW10_INT = {6: 10 ** 6, 8: 10 ** 8, 18: 10 ** 18}
+
+
+def _format_wei_int(wei_amount: int, decimals: int) -> str:
+    """
+    Integer-only equivalent of format_wei's Decimal formatting for non-negative ints
+
+    Uses the same tiers as _FORMAT_THRESHOLDS (amounts of exactly 0.01 get 6 places)
+    and the same round-half-even as Decimal formatting.
+    """
+    unit = _POW10_INT.get(decimals) or 10 ** decimals
+
+    # Same precision tiers as format_wei
+    if wei_amount >= 1000 * unit:
+        places = 2
+    elif wei_amount >= unit:
+        places = 4
+    elif wei_amount * 100 >= unit:
+        places = 6
+    else:
+        places = 8
+
+    # Round half-even to `places` digits, as Decimal formatting does
+    quotient, remainder = divmod(wei_amount * 10 ** places, unit)
+    if remainder * 2 > unit or (remainder * 2 == unit and quotient & 1):
+        quotient += 1
+    whole, frac = divmod(quotient, 10 ** places)
+    if places == 2:
+        return f"{whole:,}.{frac:02d}"
+    return f"{whole}.{frac:0{places}d}"
+
+
+@lru_cache(maxsize=32)
+def _pow10(decimals: int) -> Decimal:
+    """10 ** decimals as a Decimal - token decimals are almost always 6, 8 or 18"""
+    return Decimal(10) ** decimals
+
 
 def format_wei(wei_amount: Union[int, str], decimals: int = 18, symbol: str = "MATIC") -> str:
     """
@@ -51,20 +204,16 @@ def format_wei(wei_amount: Union[int, str], decimals: int = 18, symbol: str = "M
     if not wei_amount:
         return f"0.0 {symbol}"
 
+    # web3 returns plain ints - format those without going through Decimal
+    if type(wei_amount) is int and wei_amount > 0 and decimals >= 0:
+        return f"{_format_wei_int(wei_amount, decimals)} {symbol}"
+
     try:
-        amount = Decimal(str(wei_amount)) / Decimal(10 ** decimals)
+        amount = Decimal(str(wei_amount)) / _pow10(decimals)
 
         # Format with appropriate precision
-        if amount >= 1000:
-            formatted = f"{amount:,.2f}"
-        elif amount >= 1:
-            formatted = f"{amount:.4f}"
-        elif amount >= 0.01:
-            formatted = f"{amount:.6f}"
-        else:
-            formatted = f"{amount:.8f}"
-
-        return f"{formatted} {symbol}"
+        template = _FORMAT_BUCKETS[bisect_right(_FORMAT_THRESHOLDS, amount)]
+        return f"{template.format(amount)} {symbol}"
     except (ValueError, TypeError):
         return f"Invalid {symbol}"
 
@@ -81,7 +230,7 @@ def wei_to_ether(wei_amount: Union[int, str], decimals: int = 18) -> Decimal:
         Decimal amount in ether
     """
     try:
-        return Decimal(str(wei_amount)) / Decimal(10 ** decimals)
+        return Decimal(str(wei_amount)) / _pow10(decimals)
     except (ValueError, TypeError):
         return Decimal('0')
 
@@ -99,41 +248,104 @@ def ether_to_wei(ether_amount: Union[float, str, Decimal], decimals: int = 18) -
     """
     try:
         decimal_amount = Decimal(str(ether_amount))
-        wei_amount = decimal_amount * Decimal(10 ** decimals)
+        wei_amount = decimal_amount * _pow10(decimals)
         return int(wei_amount)
     except (ValueError, TypeError):
         return 0
 
 
+# Gas station speed names accepted by calculate_gas_price
+_GAS_SPEED_MAP = {
+    "safeLow": "safeLow",
+    "safe_low": "safeLow",
+    "standard": "standard",
+    "fast": "fast",
+    "fastest": "fastest"
+}
+
+# Fallback gas prices in gwei (converted to wei) when the gas station is unreachable
+_FALLBACK_GAS_WEI = {
+    "safeLow": 30 * GWEI_PER_ETH,
+    "safe_low": 30 * GWEI_PER_ETH,
+    "standard": 40 * GWEI_PER_ETH,
+    "fast": 60 * GWEI_PER_ETH,
+    "fastest": 80 * GWEI_PER_ETH
+}
+
+
+def _get_gas_cached(url: str, ttl: float) -> Optional[Dict[str, Any]]:
+    """Return the cached gas station response for url if it is fresher than ttl, else None."""
+    with _GAS_CACHE_LOCK:
+        if (_GAS_CACHE["data"] is not None and _GAS_CACHE["url"] == url
+                and time.monotonic() - _GAS_CACHE["ts"] < ttl):
+            return _GAS_CACHE["data"]
+    return None
+
+
+def _fetch_gas_data(url: str, max_stale: float = float("inf")) -> Dict[str, Any]:
+    """
+    Fetch gas station data over the network. Callers check _get_gas_cached first.
+
+    Refetches are conditional: the last ETag is sent as If-None-Match and a
+    304 reply just refreshes the cached response's age.
+
+    If the request fails, the last response is returned if it is younger than
+    max_stale seconds; otherwise the exception propagates.
+    """
+    with _GAS_CACHE_LOCK:
+        cached = _GAS_CACHE["data"] if _GAS_CACHE["url"] == url else None
+        etag = _GAS_CACHE["etag"] if cached is not None else None
+        cached_ts = _GAS_CACHE["ts"]
+
+    try:
+        headers = {"If-None-Match": etag} if etag else None
+        response = _SESSION.get(url, headers=headers, timeout=5)
+
+        if response.status_code == 304 and cached is not None:
+            with _GAS_CACHE_LOCK:
+                _GAS_CACHE["ts"] = time.monotonic()
+            return cached
+
+        response.raise_for_status()
+        gas_data = orjson.loads(response.content) if ORJSON_AVAILABLE else response.json()
+    except Exception:
+        if cached is not None and time.monotonic() - cached_ts < max_stale:
+            return cached  # Stale, but better than the hardcoded fallback
+        raise
+
+    with _GAS_CACHE_LOCK:
+        _GAS_CACHE.update(ts=time.monotonic(), url=url, data=gas_data, etag=response.headers.get("ETag"))
+    return gas_data
+
+
 def calculate_gas_price(
         speed: str = "standard",
-        polygon_gas_station_url: str = "https://gasstation.polygon.technology/v2"
+        polygon_gas_station_url: str = "https://gasstation.polygon.technology/v2",
+        ttl: float = 3.0
 ) -> Optional[int]:
     """
     Calculate gas price for Polygon network.
 
+    The TTL cache is checked before anything else, so a cache hit never
+    touches the network path; only a miss goes on to _fetch_gas_data.
+    If the gas station is unreachable the last response keeps being used for
+    up to _GAS_MAX_STALE_TTLS * ttl seconds, then the hardcoded fallback applies.
+
     Args:
         speed: Gas speed ("safeLow", "standard", "fast", "fastest")
         polygon_gas_station_url: URL for Polygon gas station API
+        ttl: Seconds a gas station response is reused before refetching
 
     Returns:
         Gas price in gwei, or None if failed
     """
     try:
-        response = requests.get(polygon_gas_station_url, timeout=5)
-        response.raise_for_status()
-        gas_data = response.json()
+        gas_data = _get_gas_cached(polygon_gas_station_url, ttl)
+        if gas_data is None:
+            gas_data = _fetch_gas_data(polygon_gas_station_url, ttl * _GAS_MAX_STALE_TTLS)
 
         # Map speed to API response
-        speed_map = {
-            "safeLow": "safeLow",
-            "safe_low": "safeLow",
-            "standard": "standard",
-            "fast": "fast",
-            "fastest": "fastest"
-        }
-
-        api_speed = speed_map.get(speed, "standard")
+        api_speed = _GAS_SPEED_MAP.get(speed, "standard")
 
         if api_speed in gas_data:
             # Gas prices are returned in gwei, convert to wei for web3
@@ -148,40 +360,42 @@ def calculate_gas_price(
         return None
 
     except Exception:
-        # Fallback gas prices in gwei (converted to wei)
-        fallback_prices = {
-            "safeLow": 30 * GWEI_PER_ETH,
-            "safe_low": 30 * GWEI_PER_ETH,
-            "standard": 40 * GWEI_PER_ETH,
-            "fast": 60 * GWEI_PER_ETH,
-            "fastest": 80 * GWEI_PER_ETH
-        }
-        return fallback_prices.get(speed, 40 * GWEI_PER_ETH)
+        return _FALLBACK_GAS_WEI.get(speed, _FALLBACK_GAS_WEI["standard"])
 
 
-def validate_address(address: str) -> bool:
+def validate_address(address: str, check_checksum: bool = False) -> bool:
     """
     Validate Ethereum/Polygon address format.
 
+    Results are cached - the bot revalidates the same small set of token
+    and pool addresses on every scan.
+
     Args:
         address: Address to validate
+        check_checksum: Also require the EIP-55 mixed-case checksum to match
 
     Returns:
         True if valid address format
     """
-    if not address:
+    # Non-strings (None, bytes, dicts from bad API data) are never valid and may be unhashable
+    if not isinstance(address, str):
         return False
+    return _validate_address_cached(address, bool(check_checksum))
 
-    # Check if it's a valid hex string with correct length
-    if not re.match(r'^0x[a-fA-F0-9]{40}$', address):
+
+@lru_cache(maxsize=4096)
+def _validate_address_cached(address: str, check_checksum: bool) -> bool:
+    """Cached body of validate_address for string input"""
+    # Cheap length/prefix test first - most invalid inputs never reach the regex
+    if not address or len(address) != 42 or not address.startswith('0x'):
         return False
 
-    # Additional validation using Web3
-    try:
-        return Web3.is_address(address)
-    except Exception:
+    # Check if it's a valid hex string
+    if not _ADDR_RE.match(address):
         return False
 
+    return not check_checksum or _checksum(address.lower()) == address
+
 
 def get_current_timestamp() -> int:
     """
@@ -203,6 +417,13 @@ def get_current_datetime() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+def _wei_to_float(wei_amount: Union[int, str], decimals: int) -> float:
+    """wei -> token units as a float; int true division is correctly rounded, so no Decimal needed"""
+    if type(wei_amount) is int:
+        return wei_amount / (_POW10_INT.get(decimals) or 10 ** decimals)
+    return float(Decimal(str(wei_amount)) / _pow10(decimals))
+
+
 def calculate_percentage_difference(price1: float, price2: float) -> float:
     """
     Calculate percentage difference between two prices.
@@ -244,27 +465,27 @@ def calculate_arbitrage_profit(
         Dictionary with profit calculations
     """
     try:
-        # Convert to decimal for precision
-        amount_decimal = wei_to_ether(amount_in, decimals)
-        gas_cost_decimal = wei_to_ether(gas_cost, 18)  # Gas always in MATIC
+        # Results are floats, so do the arithmetic in floats too
+        amount = _wei_to_float(amount_in, decimals)
+        gas = _wei_to_float(gas_cost, 18)  # Gas always in MATIC
 
         # Calculate amounts
-        tokens_bought = amount_decimal / Decimal(str(price_buy))
-        revenue = tokens_bought * Decimal(str(price_sell))
-        gross_profit = revenue - amount_decimal
-        net_profit = gross_profit - gas_cost_decimal
+        tokens_bought = amount / price_buy
+        revenue = tokens_bought * price_sell
+        gross_profit = revenue - amount
+        net_profit = gross_profit - gas
 
         # Calculate percentages
-        profit_percentage = float((net_profit / amount_decimal) * 100) if amount_decimal > 0 else 0
+        profit_percentage = (net_profit / amount) * 100 if amount > 0 else 0
         price_difference = calculate_percentage_difference(price_buy, price_sell)
 
         return {
-            "amount_in": float(amount_decimal),
-            "tokens_bought": float(tokens_bought),
-            "revenue": float(revenue),
-            "gross_profit": float(gross_profit),
-            "gas_cost": float(gas_cost_decimal),
-            "net_profit": float(net_profit),
+            "amount_in": amount,
+            "tokens_bought": tokens_bought,
+            "revenue": revenue,
+            "gross_profit": gross_profit,
+            "gas_cost": gas,
+            "net_profit": net_profit,
             "profit_percentage": profit_percentage,
             "price_difference": price_difference,
             "is_profitable": net_profit > 0
@@ -332,7 +553,7 @@ def format_percentage(percentage: float, decimals: int = 2, show_sign: bool = Tr
         return "0.00%"
 
 
-def chunks(lst: List[Any], chunk_size: int) -> List[List[Any]]:
+def chunks(lst: List[Any], chunk_size: int) -> Iterator[List[Any]]:
     """
     Split list into chunks of specified size.
 
@@ -340,53 +561,106 @@ def chunks(lst: List[Any], chunk_size: int) -> List[List[Any]]:
         lst: List to split
         chunk_size: Size of each chunk
 
-    Returns:
-        List of chunks
+    Yields:
+        Successive chunks; wrap in list() if all chunks are needed at once
     """
-    return [lst[i:i + chunk_size] for i in range(0, len(lst), chunk_size)]
+    for i in range(0, len(lst), chunk_size):
+        yield lst[i:i + chunk_size]
 
 
 def retry_with_backoff(
         func,
         max_retries: int = 3,
         initial_delay: float = 1.0,
-        backoff_factor: float = 2.0
+        backoff_factor: float = 2.0,
+        retry_on: Tuple[type, ...] = _TRANSIENT_ERRORS
 ):
     """
-    Retry function with exponential backoff.
+    Retry function with exponential backoff and jitter.
+
+    Coroutine functions get an async wrapper that sleeps with asyncio.sleep,
+    so retries never block the event loop.
 
     Args:
-        func: Function to retry
+        func: Function or coroutine function to retry
         max_retries: Maximum number of retries
         initial_delay: Initial delay in seconds
         backoff_factor: Multiplier for delay
+        retry_on: Exception types treated as transient; anything else is raised immediately.
+            Defaults to network and timeout errors (requests errors, ConnectionError,
+            TimeoutError). Earlier versions retried on any Exception - pass
+            retry_on=(Exception,) for that behaviour.
 
     Returns:
         Function result or raises last exception
     """
 
+    def _backoff(attempt: int) -> float:
+        delay = initial_delay * backoff_factor ** attempt
+        # Up to 10% random jitter so workers hitting the same endpoint don't retry in lockstep
+        return delay + random.uniform(0, delay * 0.1)
+
+    if asyncio.iscoroutinefunction(func):
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            last_exception = None
+
+            for attempt in range(max_retries + 1):
+                try:
+                    return await func(*args, **kwargs)
+                except retry_on as e:
+                    last_exception = e
+                    if attempt < max_retries:
+                        await asyncio.sleep(_backoff(attempt))
+
+            raise last_exception
+
+        return async_wrapper
+
+    @wraps(func)
     def wrapper(*args, **kwargs):
-        delay = initial_delay
         last_exception = None
 
         for attempt in range(max_retries + 1):
             try:
                 return func(*args, **kwargs)
-            except Exception as e:
+            except retry_on as e:
                 last_exception = e
                 if attempt < max_retries:
-                    time.sleep(delay)
-                    delay *= backoff_factor
+                    time.sleep(_backoff(attempt))
 
         raise last_exception
 
     return wrapper
 
 
+@lru_cache(maxsize=4096)
+def _checksum(addr_lower: str) -> str:
+    """Checksum a lowercase address; cached because each call hashes the address with keccak256."""
+    return Web3.to_checksum_address(addr_lower)
+
+
+# Addresses already seen to have code, per Web3 instance. Only positives are
+# cached: deployed code doesn't go away (selfdestruct aside), but an address
+# without code today can still be deployed to later.
+_KNOWN_CONTRACTS: "weakref.WeakKeyDictionary[Any, set]" = weakref.WeakKeyDictionary()
+
+
+def _known_contracts(web3_instance) -> set:
+    """Known-contract set for web3_instance; a throwaway set if the instance can't be weakly referenced"""
+    try:
+        return _KNOWN_CONTRACTS.setdefault(web3_instance, set())
+    except TypeError:
+        return set()
+
+
 def is_contract_address(web3_instance, address: str) -> bool:
     """
     Check if address is a contract (has code).
 
+    Positive results are cached per Web3 instance, so known contracts
+    skip the eth_getCode call.
+
     Args:
         web3_instance: Web3 instance
         address: Address to check
@@ -398,12 +672,64 @@ def is_contract_address(web3_instance, address: str) -> bool:
         if not validate_address(address):
             return False
 
-        code = web3_instance.eth.get_code(Web3.to_checksum_address(address))
-        return len(code) > 0
+        checksum = _checksum(address.lower())
+        known = _known_contracts(web3_instance)
+        if checksum in known:
+            return True
+
+        code = web3_instance.eth.get_code(checksum)
+        if len(code) > 0:
+            known.add(checksum)
+            return True
+        return False
     except Exception:
         return False
 
 
+def are_contract_addresses(web3_instance, addresses: List[str]) -> List[bool]:
+    """
+    Check which addresses are contracts, fetching all code in one batched RPC request.
+
+    Addresses already known to be contracts are answered from the cache
+    shared with is_contract_address and left out of the batch.
+
+    Args:
+        web3_instance: Web3 instance
+        addresses: Addresses to check
+
+    Returns:
+        List of booleans in the same order as addresses (False for invalid
+        addresses, or for every address if the batch request fails)
+    """
+    results = [False] * len(addresses)
+    known = _known_contracts(web3_instance)
+    pending = []
+    for i, address in enumerate(addresses):
+        if validate_address(address):
+            checksum = _checksum(address.lower())
+            if checksum in known:
+                results[i] = True
+            else:
+                pending.append((i, checksum))
+    if not pending:
+        return results
+
+    try:
+        with web3_instance.batch_requests() as batch:
+            for _, checksum in pending:
+                batch.add(web3_instance.eth.get_code(checksum))
+            codes = batch.execute()
+
+        for (i, checksum), code in zip(pending, codes):
+            if len(code) > 0:
+                known.add(checksum)
+                results[i] = True
+    except Exception:
+        return [False] * len(addresses)
+
+    return results
+
+
 def calculate_slippage_amount(
         amount: Union[int, str],
         slippage_percent: float,
@@ -420,16 +746,31 @@ def calculate_slippage_amount(
     Returns:
         Amount adjusted for slippage
     """
+    if type(amount) is str and "." not in amount:
+        try:
+            amount = int(amount)
+        except ValueError:
+            pass
+
+    if type(amount) is int and amount >= 0 and isinstance(slippage_percent, (int, float)):
+        # Exact integer path: slippage in millionths of the amount. Float math
+        # would lose the low digits of 18-decimal wei amounts.
+        scaled = slippage_percent * 10_000
+        ppm = round(scaled)
+        if abs(scaled - ppm) < 1e-6:
+            factor = _SLIPPAGE_PPM_SCALE - ppm if is_minimum else _SLIPPAGE_PPM_SCALE + ppm
+            return amount * factor // _SLIPPAGE_PPM_SCALE
+
     try:
         amount_decimal = Decimal(str(amount))
-        slippage_factor = Decimal(str(slippage_percent)) / Decimal('100')
+        slippage_factor = Decimal(str(slippage_percent)) / _DEC_100
 
         if is_minimum:
             # Minimum amount out (reduce by slippage)
-            adjusted = amount_decimal * (Decimal('1') - slippage_factor)
+            adjusted = amount_decimal * (_DEC_ONE - slippage_factor)
         else:
             # Maximum amount in (increase by slippage)
-            adjusted = amount_decimal * (Decimal('1') + slippage_factor)
+            adjusted = amount_decimal * (_DEC_ONE + slippage_factor)
 
         return int(adjusted)
     except Exception:
@@ -439,14 +780,16 @@ def calculate_slippage_amount(
 # Time-related helpers
 def seconds_until_next_minute() -> int:
     """Get seconds until next minute."""
-    now = datetime.now()
-    return SECONDS_PER_MINUTE - now.second
+    return SECONDS_PER_MINUTE - int(time.time()) % SECONDS_PER_MINUTE
 
 
 def seconds_until_next_hour() -> int:
-    """Get seconds until next hour."""
-    now = datetime.now()
-    return SECONDS_PER_HOUR - (now.minute * SECONDS_PER_MINUTE + now.second)
+    """Get seconds until next hour (UTC hour boundaries)."""
+    return SECONDS_PER_HOUR - int(time.time()) % SECONDS_PER_HOUR
+
+
+# Largest unit first: (seconds per unit, suffix)
+_DURATION_UNITS = ((SECONDS_PER_DAY, 'd'), (SECONDS_PER_HOUR, 'h'), (SECONDS_PER_MINUTE, 'm'))
 
 
 def format_duration(seconds: Union[int, float]) -> str:
@@ -460,34 +803,13 @@ def format_duration(seconds: Union[int, float]) -> str:
         Formatted duration string
     """
     try:
-        if seconds < 60:
-            return f"{seconds:.1f}s"
-        elif seconds < 3600:
-            minutes = seconds / 60
-            return f"{minutes:.1f}m"
-        elif seconds < 86400:
-            hours = seconds / 3600
-            return f"{hours:.1f}h"
-        else:
-            days = seconds / 86400
-            return f"{days:.1f}d"
+        for threshold, suffix in _DURATION_UNITS:
+            if seconds >= threshold:
+                return f"{seconds / threshold:.1f}{suffix}"
+        return f"{seconds:.1f}s"
     except (ValueError, TypeError):
         return "0s"
 
-# Helper functions
-"""
-Utility helper functions for the arbitrage bot
-"""
-import time
-import json
-import hashlib
-from decimal import Decimal, ROUND_HALF_UP
-from typing import Dict, Any, List, Optional, Union
-from web3 import Web3
-from datetime import datetime, timedelta
-import logging
-
-logger = logging.getLogger(__name__)
 
 def format_amount(amount: Union[int, float, Decimal, str], decimals: int = 18, precision: int = 6) -> str:
     """
@@ -509,13 +831,13 @@ def format_amount(amount: Union[int, float, Decimal, str], decimals: int = 18, p
         
         # Convert from wei if needed
         if decimals > 0:
-            divisor = Decimal(10) ** decimals
+            divisor = _pow10(decimals)
             formatted = amount / divisor
         else:
             formatted = amount
         
         # Round to specified precision
-        quantizer = Decimal(10) ** -precision
+        quantizer = _pow10(-precision)
         rounded = formatted.quantize(quantizer, rounding=ROUND_HALF_UP)
         
         # Remove trailing zeros
@@ -538,7 +860,7 @@ def parse_amount(amount_str: str, decimals: int = 18) -> int:
     """
     try:
         amount = Decimal(amount_str)
-        multiplier = Decimal(10) ** decimals
+        multiplier = _pow10(decimals)
         wei_amount = int(amount * multiplier)
         return wei_amount
     except Exception as e:
@@ -656,21 +978,6 @@ def estimate_profit(
         logger.error(f"Error estimating profit: {e}")
         return {'profitable': False, 'net_profit': 0}
 
-def validate_address(address: str) -> bool:
-    """
-    Validate Ethereum address format
-    
-    Args:
-        address: Address to validate
-        
-    Returns:
-        True if valid address
-    """
-    try:
-        return Web3.is_address(address)
-    except:
-        return False
-
 def to_checksum_address(address: str) -> str:
     """
     Convert address to checksum format
@@ -682,7 +989,7 @@ def to_checksum_address(address: str) -> str:
         Checksum address
     """
     try:
-        return Web3.to_checksum_address(address)
+        return _checksum(address.lower())
     except:
         return address
 
@@ -711,8 +1018,9 @@ def create_trade_hash(
     if not timestamp:
         timestamp = int(time.time())
         
+    # Dedup key only, not a security boundary - blake2b is faster than md5 with the same hex length
     trade_string = f"{token_in}{token_out}{amount_in}{dex_in}{dex_out}{timestamp}"
-    return hashlib.md5(trade_string.encode()).hexdigest()
+    return hashlib.blake2b(trade_string.encode(), digest_size=16).hexdigest()
 
 def retry_on_failure(max_retries: int = 3, delay: float = 1.0):
     """
@@ -768,19 +1076,6 @@ def truncate_address(address: str, start_chars: int = 6, end_chars: int = 4) ->
         return address
     return f"{address[:start_chars]}...{address[-end_chars:]}"
 
-def format_duration(seconds: float) -> str:
-    """
-    Format duration in human readable format
-    """
-    if seconds < 60:
-        return f"{seconds:.1f}s"
-    elif seconds < 3600:
-        minutes = seconds / 60
-        return f"{minutes:.1f}m"
-    else:
-        hours = seconds / 3600
-        return f"{hours:.1f}h"
-
 def validate_private_key(private_key: str) -> bool:
     """
     Validate private key format
@@ -809,17 +1104,73 @@ def load_json_file(file_path: str) -> Dict[str, Any]:
     Safely load JSON file
     """
     try:
+        # Stays on the stdlib parser: orjson reads integers beyond 64 bits
+        # (wei amounts) back as floats, silently losing precision
         with open(file_path, 'r') as f:
             return json.load(f)
     except Exception as e:
         logger.error(f"Error loading JSON file {file_path}: {e}")
         return {}
 
+# orjson options matching json.dump(indent=2, default=str): datetimes and
+# dataclasses are handed to the default hook and written as str(obj). Non-str
+# keys are rejected (no OPT_NON_STR_KEYS) so json.dump handles them as before.
+_ORJSON_SAVE_OPTIONS = (orjson.OPT_INDENT_2 | orjson.OPT_PASSTHROUGH_DATETIME |
+                        orjson.OPT_PASSTHROUGH_DATACLASS) if ORJSON_AVAILABLE else 0
+
+# repr() - and so json.dump - writes floats outside this range in exponent form
+# ("1e-07", "1e+16"), which orjson spells differently ("1e-7", "1e16")
+_JSON_FIXED_FLOAT_RANGE = (1e-4, 1e16)
+
+
+def _orjson_default(obj: Any) -> Any:
+    """default= hook for orjson, reproducing json.dump(default=str) output"""
+    if isinstance(obj, float):
+        return float(obj)  # Float subclasses (numpy.float64) are numbers to the json module
+    return str(obj)
+
+
+def _orjson_matches_json(obj: Any) -> bool:
+    """True if orjson writes obj exactly as json.dump: finite fixed-point floats and no Enum members"""
+    low, high = _JSON_FIXED_FLOAT_RANGE
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, float):
+            # NaN fails both comparisons; orjson would write NaN/Infinity as null
+            if item and not low <= abs(item) < high:
+                return False
+        elif isinstance(item, Enum):
+            return False  # orjson writes the value, json.dump(default=str) writes str(member)
+        elif isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+    return True
+
+
 def save_json_file(data: Dict[str, Any], file_path: str) -> bool:
     """
     Safely save JSON file
+
+    Uses orjson when available, with output matching json.dump(indent=2, default=str).
+    Payloads orjson would write differently go through json.dump instead: non-finite
+    or exponent-form floats, Enum members, non-str keys, and non-ASCII text
+    (json \\u-escapes it).
     """
     try:
+        if ORJSON_AVAILABLE and _orjson_matches_json(data):
+            try:
+                payload = orjson.dumps(data, default=_orjson_default, option=_ORJSON_SAVE_OPTIONS)
+            except orjson.JSONEncodeError:
+                payload = None  # e.g. non-str keys or wei amounts beyond 64 bits - let the stdlib handle it
+            if payload is not None and not payload.isascii():
+                payload = None  # json escapes non-ASCII as \uXXXX; orjson can't
+            if payload is not None:
+                with open(file_path, 'wb') as f:
+                    f.write(payload)
+                return True
+
         with open(file_path, 'w') as f:
             json.dump(data, f, indent=2, default=str)
         return True
@@ -834,10 +1185,6 @@ def is_profitable_after_gas(profit_usd: float, gas_cost_usd: float, min_profit_u
     net_profit = profit_usd - gas_cost_usd
     return net_profit >= min_profit_usd
 
-def get_current_timestamp() -> int:
-    """Get current timestamp in seconds"""
-    return int(time.time())
-
 def timestamp_to_datetime(timestamp: int) -> datetime:
     """Convert timestamp to datetime"""
     return datetime.fromtimestamp(timestamp)
@@ -848,34 +1195,46 @@ def datetime_to_timestamp(dt: datetime) -> int:
 
 # Rate limiting helper
 class RateLimiter:
-    """Simple rate limiter"""
+    """
+    Token-bucket rate limiter: max_calls per time_window, refilled continuously
+
+    A time_window of 0 (or less) disables limiting, as with the original
+    sliding-window implementation.
+    """
     
     def __init__(self, max_calls: int, time_window: int):
         self.max_calls = max_calls
         self.time_window = time_window
-        self.calls = []
+        self.rate = max_calls / time_window if time_window > 0 else None  # Tokens per second; None = unlimited
+        self.tokens = float(max_calls)
+        self.last_update = time.monotonic()
+    
+    def _refill(self):
+        """Add the tokens accrued since the last update"""
+        now = time.monotonic()
+        if self.rate is None:
+            self.tokens = float(self.max_calls)
+        else:
+            self.tokens = min(self.max_calls, self.tokens + (now - self.last_update) * self.rate)
+        self.last_update = now
     
     def is_allowed(self) -> bool:
         """Check if call is allowed"""
-        now = time.time()
-        
-        # Remove old calls
-        self.calls = [call_time for call_time in self.calls if now - call_time < self.time_window]
+        self._refill()
         
         # Check if we can make another call
-        if len(self.calls) < self.max_calls:
-            self.calls.append(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
             return True
         return False
     
     def wait_time(self) -> float:
         """Get time to wait before next call"""
-        if not self.calls:
-            return 0
+        self._refill()
         
-        oldest_call = min(self.calls)
-        wait_time = self.time_window - (time.time() - oldest_call)
-        return max(0, wait_time)
+        if self.tokens >= 1 or not self.rate:
+            return 0  # No rate means no limiting, or (max_calls=0) nothing to wait for
+        return (1 - self.tokens) / self.rate
 def calculate_profit_percentage(buy_price: float, sell_price: float, gas_cost: float = 0.0) -> float:
     """
     Calculate profit percentage after accounting for gas costs
@@ -894,10 +1253,28 @@ def calculate_profit_percentage(buy_price: float, sell_price: float, gas_cost: f
     revenue = sell_price - buy_price - gas_cost
     return (revenue / buy_price) * 100.0
 
+# Common token decimals (you can expand this list) - keys are lowercase
+_TOKEN_DECIMALS = {
+    "0x2791bca1f2de4661ed88a30c99a7a9449aa84174": 6,  # USDC
+    "0xc2132d05d31c914a87c6611c10748aeb04b58e8f": 6,  # USDT
+    "0x8f3cf7ad23cd3cadbd9735aff958023239c6a063": 18, # DAI
+    "0x0d500b1d8e8ef31e21c99d1db9a6444d3adf1270": 18, # WMATIC
+    "0x7ceb23fd6bc0add59e62ac25578270cff1b9f619": 18, # WETH
+    "0x1bfd67037b42cf73acf2047067bd4f2c47d9bfd6": 8,  # WBTC
+}
+
+# Warm the checksum cache for the known tokens
+for _token in _TOKEN_DECIMALS:
+    _checksum(_token)
+del _token
+
+@lru_cache(maxsize=4096)
 def get_token_decimals(token_address: str, default: int = 18) -> int:
     """
     Get token decimals for a given token address.
     
+    Results are cached per (token_address, default), so default must be hashable.
+    
     Args:
         token_address: Token contract address
         default: Default decimals if not found
@@ -905,14 +1282,4 @@ def get_token_decimals(token_address: str, default: int = 18) -> int:
     Returns:
         Number of decimals for the token
     """
-    # Common token decimals (you can expand this list)
-    common_tokens = {
-        "0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174": 6,  # USDC
-        "0xc2132D05D31c914a87C6611C10748AEb04B58e8F": 6,  # USDT
-        "0x8f3Cf7ad23Cd3CaDbD9735AFf958023239c6A063": 18, # DAI
-        "0x0d500B1d8E8eF31E21C99d1Db9A6444d3ADf1270": 18, # WMATIC
-        "0x7ceB23fD6bC0adD59E62ac25578270cFf1b9f619": 18, # WETH
-        "0x1bfd67037b42cf73acf2047067bd4f2c47d9bfd6": 8,  # WBTC
-    }
-    
-    return common_tokens.get(token_address.lower(), default)
+    return _TOKEN_DECIMALS.get(token_address.lower(), default)
@@ -26,9 +26,11 @@ Usage:
 import smtplib
 import json
 import os
+import re
 import sys
+import time
 from datetime import datetime, time as dt_time
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Deque
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from dataclasses import dataclass
@@ -36,10 +38,37 @@ from collections import defaultdict, deque
 import asyncio
 import aiohttp
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:  # Optional - payloads fall back to the stdlib json module
+    ORJSON_AVAILABLE = False
+
 from .logger import get_logger
 
 logger = get_logger(__name__)
 
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Strips markdown emphasis/code marks in one pass ("**" goes with its "*"s)
+_MARKDOWN_STRIP = str.maketrans('', '', '*`')
+
+# Overall time budget for one notification across all channels, and the
+# per-request limit for each individual webhook call
+NOTIFICATION_TIMEOUT = 10
+_REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=5)
+
+# Discord accepts at most this many embeds per webhook message
+DISCORD_MAX_EMBEDS = 10
+
+# Fixed parts of every NotificationManager Discord message; the footer dict is
+# shared by all embeds and only ever serialized, never mutated
+_DISCORD_USERNAME = 'Flashloan Bot'
+_DISCORD_FOOTER = {"text": "Flashloan Arbitrage Bot"}
+
+# First number in a profit string such as "$25.50" or "25.50 MATIC"
+_PROFIT_RE = re.compile(r'\$?(\d+\.?\d*)')
+
 
 @dataclass
 class NotificationConfig:
@@ -108,48 +137,111 @@ class NotificationConfig:
         )
 
 
+def _json_body(payload: Dict[str, Any]) -> bytes:
+    """Serialize a webhook payload, with orjson when it is installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode()
+
+
 class NotificationBatcher:
     """Smart batching system for grouping similar notifications."""
 
-    def __init__(self, batch_interval: int = 300):  # 5 minutes
+    def __init__(
+            self,
+            batch_interval: int = 300,  # 5 minutes
+            max_batch_items: int = 1000,
+            on_flush=None,
+            max_batch_size: int = 500
+    ):
         self.batch_interval = batch_interval
-        self.batches = defaultdict(list)
-        self.batch_timers = {}
+        # A batch reaching this many events is flushed immediately instead of waiting
+        self.max_batch_size = max_batch_size
+        # Async callable given the list of summaries produced by each flush
+        self.on_flush = on_flush
+        # Bounded per type - during a surge the oldest events are dropped
+        self.batches = defaultdict(lambda: deque(maxlen=max_batch_items))
         self.last_batch_sent = defaultdict(float)
+        # One background task flushes every batch type each batch_interval
+        self._flush_task: Optional[asyncio.Task] = None
+        # Flushes still in flight (held so they aren't garbage collected and close() can wait on them)
+        self._pending_flushes = set()
 
     def add_to_batch(self, batch_type: str, notification_data: Dict[str, Any]):
         """Add notification to batch queue."""
-        self.batches[batch_type].append({
+        batch = self.batches[batch_type]
+        batch.append({
             **notification_data,
             'timestamp': datetime.now()
         })
 
-        # Start batch timer if not already running
-        if batch_type not in self.batch_timers:
-            self.batch_timers[batch_type] = asyncio.create_task(
-                self._process_batch_after_delay(batch_type)
-            )
-
-    async def _process_batch_after_delay(self, batch_type: str):
-        """Process batched notifications after delay."""
-        await asyncio.sleep(self.batch_interval)
-
-        if batch_type in self.batches and self.batches[batch_type]:
-            batch_data = list(self.batches[batch_type])
-            self.batches[batch_type].clear()
-
-            # Generate batch summary
+        # Full batch: hand it off now so a surge doesn't wait out the interval
+        if len(batch) >= self.max_batch_size:
+            self._track_flush(asyncio.create_task(self._flush_batch(batch_type, self.batches.pop(batch_type))))
+
+        # Start the flush loop on first use - there is no event loop yet at construction
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    def _track_flush(self, task: asyncio.Task) -> asyncio.Task:
+        """Hold a flush task until it finishes."""
+        self._pending_flushes.add(task)
+        task.add_done_callback(self._pending_flushes.discard)
+        return task
+
+    async def _flush_loop(self):
+        """Flush all pending batches every batch_interval seconds."""
+        while True:
+            await asyncio.sleep(self.batch_interval)
+            # Shielded - cancelling the loop must not drop batches the flush already took out
+            await asyncio.shield(self._track_flush(asyncio.create_task(self._flush_all())))
+
+    async def _flush_all(self):
+        """Flush every pending batch, logging instead of raising."""
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Error flushing notification batches: {e}")
+
+    async def flush(self) -> List[Dict]:
+        """Summarize every pending batch and hand the summaries to on_flush together."""
+        summaries = []
+        for batch_type in list(self.batches):
+            # Take the whole batch; new events for this type start a fresh deque
+            batch_data = self.batches.pop(batch_type)
             summary = self._create_batch_summary(batch_type, batch_data)
             if summary:
-                return summary
+                summaries.append(summary)
 
-        # Clean up timer
-        if batch_type in self.batch_timers:
-            del self.batch_timers[batch_type]
+        if summaries and self.on_flush:
+            await self.on_flush(summaries)
 
-        return None
+        return summaries
+
+    async def _flush_batch(self, batch_type: str, batch_data: Deque[Dict]):
+        """Summarize one batch that was taken out early and hand it to on_flush."""
+        try:
+            summary = self._create_batch_summary(batch_type, batch_data)
+            if summary and self.on_flush:
+                await self.on_flush([summary])
+        except Exception as e:
+            logger.error(f"Error flushing {batch_type} batch: {e}")
 
-    def _create_batch_summary(self, batch_type: str, batch_data: List[Dict]) -> Optional[Dict]:
+    async def close(self):
+        """Stop the flush loop and send whatever is still pending."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        # Let in-flight flushes (including one the loop was running) finish delivering
+        if self._pending_flushes:
+            await asyncio.gather(*self._pending_flushes, return_exceptions=True)
+        await self.flush()
+
+    def _create_batch_summary(self, batch_type: str, batch_data: Deque[Dict]) -> Optional[Dict]:
         """Create summary message for batched notifications."""
         if not batch_data:
             return None
@@ -160,9 +252,17 @@ class NotificationBatcher:
         duration = (end_time - start_time).total_seconds()
 
         if batch_type == 'profit':
-            total_profit = sum(item.get('profit_usd', 0) for item in batch_data)
-            pairs = list(set(item.get('token_pair', '') for item in batch_data))
-            max_profit = max(item.get('profit_usd', 0) for item in batch_data)
+            # One pass for total, best trade and pairs (dict keeps first-seen order)
+            total_profit = 0
+            max_profit = float('-inf')
+            pairs = {}
+            for item in batch_data:
+                profit = item.get('profit_usd', 0)
+                total_profit += profit
+                if profit > max_profit:
+                    max_profit = profit
+                pairs[item.get('token_pair', '')] = None
+            pairs = list(pairs)
             avg_profit = total_profit / count
 
             title = f"Trading Summary ({count} trades)"
@@ -182,8 +282,13 @@ class NotificationBatcher:
             }
 
         elif batch_type == 'opportunity':
-            unique_pairs = list(set(item.get('token_pair', '') for item in batch_data))
-            avg_profit = sum(item.get('profit_percent', 0) for item in batch_data) / count
+            total_percent = 0
+            unique_pairs = {}
+            for item in batch_data:
+                total_percent += item.get('profit_percent', 0)
+                unique_pairs[item.get('token_pair', '')] = None
+            unique_pairs = list(unique_pairs)
+            avg_profit = total_percent / count
 
             title = f"Opportunities Summary ({count} found)"
             message = (
@@ -209,10 +314,26 @@ class AlertRateLimiter:
     def __init__(self, config: NotificationConfig):
         self.config = config
         self.max_per_hour = config.max_alerts_per_hour
-        self.alerts_sent = []
         self.last_alert_times = {}
+
+        # Hourly limit as a token bucket: holds up to max_per_hour alerts, refilled continuously
+        self.tokens = float(self.max_per_hour)
+        self.refill_rate = self.max_per_hour / 3600.0
+        self.last_refill = time.monotonic()
         self.rate_limited_until = 0
 
+        # Dry-run is fixed by the command line/environment at startup
+        self._dry_run = '--dry-run' in sys.argv or os.getenv('DRY_RUN_MODE', '').lower() == 'true'
+
+        # Quiet hours window, parsed once; None if the configured times are invalid
+        try:
+            self._quiet_start = dt_time.fromisoformat(config.notification_quiet_start)
+            self._quiet_end = dt_time.fromisoformat(config.notification_quiet_end)
+            self._quiet_overnight = self._quiet_start > self._quiet_end
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Invalid quiet hours configuration, ignoring: {e}")
+            self._quiet_start = self._quiet_end = None
+
         # Minimum intervals between same type of alerts (seconds)
         self.min_intervals = {
             'profit': 60 if config.batch_notifications else 30,
@@ -227,7 +348,7 @@ class AlertRateLimiter:
         """Enhanced check with environment controls."""
 
         # Check dry run mode
-        if self._is_dry_run() and not self.config.dry_run_notifications:
+        if self._dry_run and not self.config.dry_run_notifications:
             logger.debug(f"Skipping {alert_type} notification - dry run mode")
             return False
 
@@ -240,66 +361,60 @@ class AlertRateLimiter:
         if alert_type in ['error', 'batch_summary']:
             return True
 
-        current_time = datetime.now().timestamp()
+        # Monotonic clock - immune to NTP/DST jumps
+        current_time = time.monotonic()
 
         # Check Discord rate limiting
         if current_time < self.rate_limited_until:
             logger.debug(f"Skipping {alert_type} alert - Discord rate limited")
             return False
 
-        # Remove old alerts
-        now = datetime.now()
-        self.alerts_sent = [
-            alert_time for alert_time in self.alerts_sent
-            if (now - alert_time).total_seconds() < 3600
-        ]
+        # Refill the hourly bucket
+        self.tokens = min(self.max_per_hour, self.tokens + (current_time - self.last_refill) * self.refill_rate)
+        self.last_refill = current_time
 
         # Check hourly limit
-        if len(self.alerts_sent) >= self.max_per_hour:
+        if self.tokens < 1:
             logger.debug(f"Hourly alert limit reached ({self.max_per_hour})")
             return False
 
         # Check minimum interval
         min_interval = self.min_intervals.get(alert_type, 15)
-        last_alert_time = self.last_alert_times.get(alert_type, 0)
+        last_alert_time = self.last_alert_times.get(alert_type, float('-inf'))
 
         if current_time - last_alert_time < min_interval:
             logger.debug(f"Skipping {alert_type} alert - too frequent")
             return False
 
         # Record alert
-        self.alerts_sent.append(now)
+        self.tokens -= 1
         self.last_alert_times[alert_type] = current_time
         return True
 
     def _is_dry_run(self) -> bool:
-        """Check if running in dry run mode."""
-        return '--dry-run' in sys.argv or os.getenv('DRY_RUN_MODE', '').lower() == 'true'
+        """Check if running in dry run mode (resolved at construction)."""
+        return self._dry_run
 
     def _is_quiet_hours(self) -> bool:
         """Check if current time is in quiet hours."""
-        try:
-            now = datetime.now().time()
-            quiet_start = dt_time.fromisoformat(self.config.notification_quiet_start)
-            quiet_end = dt_time.fromisoformat(self.config.notification_quiet_end)
-
-            # Handle overnight quiet hours (e.g., 23:00 to 07:00)
-            if quiet_start > quiet_end:
-                return now >= quiet_start or now <= quiet_end
-            else:
-                return quiet_start <= now <= quiet_end
-        except Exception as e:
-            logger.debug(f"Error checking quiet hours: {e}")
+        if self._quiet_start is None:
             return False
 
+        now = datetime.now().time()
+
+        # Handle overnight quiet hours (e.g., 23:00 to 07:00)
+        if self._quiet_overnight:
+            return now >= self._quiet_start or now <= self._quiet_end
+        return self._quiet_start <= now <= self._quiet_end
+
     def set_rate_limited(self, retry_after: float = 60):
         """Set rate limit status."""
-        self.rate_limited_until = datetime.now().timestamp() + retry_after
+        self.rate_limited_until = time.monotonic() + retry_after
         logger.warning(f"Rate limited for {retry_after} seconds")
 
     def is_rate_limited(self) -> bool:
         """Check if currently rate limited."""
-        return datetime.now().timestamp() < self.rate_limited_until
+        return time.monotonic() < self.rate_limited_until
 
 
 class NotificationManager:
@@ -317,7 +432,8 @@ class NotificationManager:
             self.config = self._convert_monitoring_config(config)
 
         self.rate_limiter = AlertRateLimiter(self.config)
-        self.batcher = NotificationBatcher() if self.config.batch_notifications else None
+        self.batcher = (NotificationBatcher(on_flush=self._send_batch_summaries)
+                        if self.config.batch_notifications else None)
         self.session = None
 
     def _convert_monitoring_config(self, monitoring_config):
@@ -346,12 +462,18 @@ class NotificationManager:
 
     async def _get_session(self) -> aiohttp.ClientSession:
         """Get or create aiohttp session."""
+        # No await between the check and the assignment, so concurrent callers can't create two
         if self.session is None:
-            self.session = aiohttp.ClientSession()
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=20, ttl_dns_cache=300, keepalive_timeout=60)
+            )
         return self.session
 
     async def close(self):
-        """Close aiohttp session."""
+        """Flush pending batches and close this manager's aiohttp session."""
+        # The standalone alerts' shared session is not ours - other callers may still use it
+        if self.batcher:
+            await self.batcher.close()
         if self.session:
             await self.session.close()
             self.session = None
@@ -480,14 +602,10 @@ class NotificationManager:
         """Extract USD profit amount from profit string."""
         try:
             # Handle formats like "$25.50", "25.50 MATIC", etc.
-            import re
-            # Look for dollar amounts first
-            dollar_match = re.search(r'\$?(\d+\.?\d*)', profit_amount.replace(',', ''))
-            if dollar_match:
-                return float(dollar_match.group(1))
-            return 0.0
-        except:
+            dollar_match = _PROFIT_RE.search(profit_amount.replace(',', ''))
+        except (AttributeError, TypeError):
             return 0.0
+        return float(dollar_match.group(1)) if dollar_match else 0.0
 
     async def _send_to_all_channels(self, title: str, message: str, color: int = 0x0080FF):
         """Send message to all enabled notification channels."""
@@ -500,36 +618,75 @@ class NotificationManager:
         if self.config.telegram_bot_token and self.config.telegram_chat_id:
             tasks.append(self._send_telegram(title, message))
 
+        return await self._gather_sends(tasks)
+
+    async def _gather_sends(self, tasks: List) -> List:
+        """Run channel sends concurrently within one NOTIFICATION_TIMEOUT budget."""
+
         if tasks:
             try:
-                results = await asyncio.gather(*tasks, return_exceptions=True)
-                return results
+                return await asyncio.wait_for(
+                    asyncio.gather(*tasks, return_exceptions=True),
+                    timeout=NOTIFICATION_TIMEOUT
+                )
+            except asyncio.TimeoutError:
+                logger.warning(f"Notification sends timed out after {NOTIFICATION_TIMEOUT}s")
             except Exception as e:
                 logger.error(f"Error sending notifications: {e}")
 
         return []
 
+    async def _send_batch_summaries(self, summaries: List[Dict]):
+        """Deliver batch summaries; all of them go to Discord as one multi-embed message."""
+
+        if not self.rate_limiter.can_send_alert("batch_summary"):
+            return []
+
+        tasks = []
+
+        if self.config.discord_webhook_url:
+            embeds = [self._build_discord_embed(s['title'], s['message'], s['color']) for s in summaries]
+            tasks.append(self._send_discord_multi(embeds))
+
+        if self.config.telegram_bot_token and self.config.telegram_chat_id:
+            tasks.extend(self._send_telegram(s['title'], s['message']) for s in summaries)
+
+        return await self._gather_sends(tasks)
+
+    @staticmethod
+    def _build_discord_embed(title: str, message: str, color: int) -> Dict[str, Any]:
+        """Build a Discord embed for one notification."""
+        return {
+            "title": title,
+            "description": message,
+            "color": color,
+            "timestamp": datetime.utcnow().isoformat(),
+            "footer": _DISCORD_FOOTER
+        }
+
     async def _send_discord(self, title: str, message: str, color: int):
         """Send Discord webhook notification with enhanced rate limit handling."""
+        return await self._send_discord_multi([self._build_discord_embed(title, message, color)])
+
+    async def _send_discord_multi(self, embeds: List[Dict[str, Any]]) -> bool:
+        """Send embeds to Discord, up to DISCORD_MAX_EMBEDS per webhook message."""
+
+        for start in range(0, len(embeds), DISCORD_MAX_EMBEDS):
+            if not await self._post_discord_embeds(embeds[start:start + DISCORD_MAX_EMBEDS]):
+                return False
+        return True
+
+    async def _post_discord_embeds(self, embeds: List[Dict[str, Any]]) -> bool:
+        """Post one Discord webhook message carrying the given embeds."""
 
         try:
             if self.rate_limiter.is_rate_limited():
                 logger.debug("Discord rate limited - skipping notification")
                 return False
 
-            embed = {
-                "title": title,
-                "description": message,
-                "color": color,
-                "timestamp": datetime.utcnow().isoformat(),
-                "footer": {
-                    "text": "Flashloan Arbitrage Bot"
-                }
-            }
-
             payload = {
-                "username": 'Flashloan Bot',
-                "embeds": [embed]
+                "username": _DISCORD_USERNAME,
+                "embeds": embeds
             }
 
             if self.config.discord_avatar_url and self.config.discord_avatar_url.startswith(("http://", "https://")):
@@ -538,9 +695,9 @@ class NotificationManager:
             session = await self._get_session()
             async with session.post(
                     self.config.discord_webhook_url,
-                    json=payload,
-                    headers={"Content-Type": "application/json"},
-                    timeout=10
+                    data=_json_body(payload),
+                    headers=_JSON_HEADERS,
+                    timeout=_REQUEST_TIMEOUT
             ) as response:
 
                 if response.status == 204:
@@ -578,7 +735,7 @@ class NotificationManager:
             }
 
             session = await self._get_session()
-            async with session.post(url, json=payload, timeout=10) as response:
+            async with session.post(url, data=_json_body(payload), headers=_JSON_HEADERS, timeout=_REQUEST_TIMEOUT) as response:
                 if response.status == 200:
                     logger.debug("Telegram notification sent successfully")
                     return True
@@ -614,8 +771,9 @@ class NotificationManager:
             session = await self._get_session()
             async with session.post(
                     self.config.slack_webhook_url,
-                    json=payload,
-                    timeout=10
+                    data=_json_body(payload),
+                    headers=_JSON_HEADERS,
+                    timeout=_REQUEST_TIMEOUT
             ) as response:
                 if response.status == 200:
                     logger.debug("Slack notification sent successfully")
@@ -636,19 +794,19 @@ class NotificationManager:
             msg['From'] = self.config.email_from
             msg['Subject'] = title
 
-            plain_message = message.replace("**", "").replace("*", "").replace("`", "")
+            plain_message = message.translate(_MARKDOWN_STRIP)
             msg.attach(MIMEText(plain_message, 'plain'))
 
-            server = smtplib.SMTP(self.config.smtp_server, self.config.smtp_port)
-            server.starttls()
-            server.login(self.config.smtp_username, self.config.smtp_password)
+            msg['To'] = ', '.join(self.config.email_to)
 
-            for recipient in self.config.email_to:
-                msg['To'] = recipient
-                text = msg.as_string()
-                server.sendmail(self.config.email_from, recipient, text)
+            with smtplib.SMTP(self.config.smtp_server, self.config.smtp_port) as server:
+                server.starttls()
+                server.login(self.config.smtp_username, self.config.smtp_password)
+
+                # One SMTP transaction with a RCPT TO per recipient
+                if self.config.email_to:
+                    server.sendmail(self.config.email_from, self.config.email_to, msg.as_string())
 
-            server.quit()
             logger.debug("Email notification sent successfully")
             return True
 
@@ -675,6 +833,41 @@ def setup_notifications(config: NotificationConfig):
     _default_manager = NotificationManager(config)
 
 
+# Shared session for the standalone alert functions below, so repeated
+# alerts reuse pooled keep-alive connections instead of a fresh TLS handshake.
+# Callers of those functions release it with close_shared_session().
+_shared_session: Optional[aiohttp.ClientSession] = None
+_shared_session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+async def _get_shared_session() -> aiohttp.ClientSession:
+    """Get the shared session, creating it for the running event loop if needed."""
+    global _shared_session, _shared_session_loop
+    loop = asyncio.get_running_loop()
+    if _shared_session is not None and not _shared_session.closed and _shared_session_loop is not loop:
+        # Left behind by an earlier event loop (e.g. a previous asyncio.run) - release it
+        stale, _shared_session = _shared_session, None
+        try:
+            await stale.close()
+        except Exception as e:
+            logger.debug(f"Error closing stale alert session: {e}")
+    if _shared_session is None or _shared_session.closed or _shared_session_loop is not loop:
+        _shared_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=50, ttl_dns_cache=300)
+        )
+        _shared_session_loop = loop
+    return _shared_session
+
+
+async def close_shared_session():
+    """Close the session used by the standalone alert functions."""
+    global _shared_session, _shared_session_loop
+    if _shared_session is not None:
+        await _shared_session.close()
+        _shared_session = None
+        _shared_session_loop = None
+
+
 # Convenience functions for backwards compatibility
 async def send_discord_alert(
         webhook_url: str,
@@ -698,9 +891,9 @@ async def send_discord_alert(
             "embeds": [embed]
         }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(webhook_url, json=payload, timeout=10) as response:
-                return response.status == 204
+        session = await _get_shared_session()
+        async with session.post(webhook_url, data=_json_body(payload), headers=_JSON_HEADERS, timeout=_REQUEST_TIMEOUT) as response:
+            return response.status == 204
 
     except Exception as e:
         logger.error(f"Discord alert error: {e}")
@@ -725,9 +918,9 @@ async def send_telegram_alert(
             "parse_mode": "Markdown"
         }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=payload, timeout=10) as response:
-                return response.status == 200
+        session = await _get_shared_session()
+        async with session.post(url, data=_json_body(payload), headers=_JSON_HEADERS, timeout=_REQUEST_TIMEOUT) as response:
+            return response.status == 200
 
     except Exception as e:
         logger.error(f"Telegram alert error: {e}")
@@ -749,9 +942,9 @@ async def send_slack_alert(
             "mrkdwn": True
         }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(webhook_url, json=payload, timeout=10) as response:
-                return response.status == 200
+        session = await _get_shared_session()
+        async with session.post(webhook_url, data=_json_body(payload), headers=_JSON_HEADERS, timeout=_REQUEST_TIMEOUT) as response:
+            return response.status == 200
 
     except Exception as e:
         logger.error(f"Slack alert error: {e}")
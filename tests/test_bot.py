@@ -12,6 +12,10 @@ from unittest.mock import Mock, MagicMock, AsyncMock, patch
 from decimal import Decimal
 from typing import Dict, List
 import json
+import numpy as np
+import os
+from datetime import datetime, date
+from enum import Enum
 
 from bot.arbitrage_bot import FlashloanArbitrageBot, FlashloanArbitrageBotManager
 from bot.opportunity_scanner import OpportunityScanner
@@ -20,6 +24,10 @@ from bot.price_feeds import PriceFeeds
 from bot.contract_interface import ContractInterface
 from config.settings import Settings
 from bot.utils.logger import get_logger
+from bot.utils import helpers
+from bot.utils.helpers import validate_address, format_wei, _format_wei_int
+from bot.utils import notifications
+from bot.utils.notifications import NotificationBatcher, AlertRateLimiter, NotificationConfig, NotificationManager
 
 logger = get_logger(__name__)
 
@@ -265,6 +273,106 @@ class TestRiskManager:
 
         logger.info("✅ Circuit breaker functionality working")
 
+    @pytest.mark.asyncio
+    async def test_circuit_breaker_half_open_probe(self, risk_manager):
+        """Test circuit breaker moves to HALF_OPEN after cooldown and closes on probe success"""
+        test_opportunity = {'amount_in': 1000, 'profit': 0.01}
+        risk_manager.circuit_breaker_cooldown = 0  # Cooldown expires immediately
+
+        for i in range(risk_manager.max_consecutive_failures):
+            await risk_manager.record_trade_result(test_opportunity, success=False, error=f"Test failure {i}")
+
+        assert risk_manager.get_risk_status()['circuit_breaker_state'] == 'OPEN'
+        assert risk_manager.circuit_breaker_active == False, "Expired breaker should allow probing"
+
+        assessment = await risk_manager.assess_trade_risk(test_opportunity)
+        assert not any("Circuit breaker active" in b for b in assessment.blockers)
+        assert risk_manager.get_risk_status()['circuit_breaker_state'] == 'HALF_OPEN'
+
+        # Failed probe re-opens the breaker
+        await risk_manager.record_trade_result(test_opportunity, success=False, error="Probe failure")
+        assert risk_manager.get_risk_status()['circuit_breaker_state'] == 'OPEN'
+
+        # Successful probe closes it
+        await risk_manager.assess_trade_risk(test_opportunity)
+        await risk_manager.record_trade_result(test_opportunity, success=True)
+        assert risk_manager.get_risk_status()['circuit_breaker_state'] == 'CLOSED'
+
+        logger.info("✅ Circuit breaker half-open probing working")
+
+    @pytest.mark.asyncio
+    async def test_circuit_breaker_half_open_single_probe(self, risk_manager):
+        """Test concurrent assessments in HALF_OPEN let exactly one probe trade through"""
+        opportunity = {
+            'token_in': '0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174',
+            'token_out': '0x7ceB23fD6bC0adD59E62ac25578270cFf1b9f619',
+            'amount_in': 1_000_000_000,
+            'profit_usd': 5.0,
+        }
+        risk_manager.circuit_breaker_cooldown = 0  # Cooldown expires immediately
+
+        for i in range(risk_manager.max_consecutive_failures):
+            await risk_manager.record_trade_result(opportunity, success=False, error=f"Test failure {i}")
+
+        assessments = await asyncio.gather(*(risk_manager.assess_trade_risk(opportunity) for _ in range(5)))
+        probes = [a for a in assessments if "Circuit breaker half-open (probe trade)" in a.warnings]
+        assert len(probes) == 1, "Only one assessment should become the probe trade"
+        assert probes[0].is_safe
+        assert sum(any("probe trade already in flight" in b for b in a.blockers) for a in assessments) == 4
+
+        # Still blocked until the probe result is recorded
+        assessment = await risk_manager.assess_trade_risk(opportunity)
+        assert not assessment.is_safe
+        assert risk_manager.get_risk_status()['circuit_breaker_state'] == 'HALF_OPEN'
+
+        await risk_manager.record_trade_result(opportunity, success=True)
+        assert risk_manager.get_risk_status()['circuit_breaker_state'] == 'CLOSED'
+
+        logger.info("✅ Circuit breaker half-open allows a single probe")
+
+    @pytest.mark.asyncio
+    async def test_recently_blocked_opportunity_short_circuits(self, risk_manager):
+        """Test an identical blocked opportunity is rejected from the recent-block cache"""
+        blocked_opportunity = {
+            'token_in': '0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174',
+            'token_out': '0x7ceB23fD6bC0adD59E62ac25578270cFf1b9f619',
+            'amount_in': 1000,
+            'profit_usd': 0.01,  # Below threshold
+        }
+
+        first = await risk_manager.assess_trade_risk(blocked_opportunity)
+        second = await risk_manager.assess_trade_risk(blocked_opportunity)
+
+        assert first.is_safe == False and second.is_safe == False
+        assert second.blockers == first.blockers, "Repeat should return the cached blockers"
+        assert risk_manager.cached_rejections == 1, "Repeat should be answered from the cache"
+
+        status = risk_manager.get_risk_status()
+        assert status['total_assessments'] == 2, "Cached rejections still count as assessments"
+        assert status['cached_rejections'] == 1
+
+        logger.info("✅ Recently blocked opportunities short-circuit")
+
+    @pytest.mark.asyncio
+    async def test_trade_rate_limit_allows_burst(self, risk_manager):
+        """Test the trade token bucket allows a short burst before rate limiting"""
+        opportunity = {
+            'token_in': '0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174',
+            'token_out': '0x7ceB23fD6bC0adD59E62ac25578270cFf1b9f619',
+            'amount_in': 1_000_000_000,
+            'profit_usd': 5.0,
+        }
+
+        for _ in range(risk_manager._bucket_capacity):
+            assessment = await risk_manager.assess_trade_risk(opportunity)
+            assert not any("Rate limit" in w for w in assessment.warnings)
+            await risk_manager.record_trade_result(opportunity, True, Decimal("5"))
+
+        assessment = await risk_manager.assess_trade_risk(opportunity)
+        assert any("Rate limit" in w for w in assessment.warnings), "Burst capacity should be exhausted"
+
+        logger.info("✅ Trade rate limit allows bursts")
+
     def test_daily_volume_limits(self, risk_manager):
         """Test daily volume limiting"""
         # Set daily volume near limit
@@ -324,6 +432,25 @@ class TestRiskManager:
 
         logger.info("✅ Risk status reporting working")
 
+    @pytest.mark.asyncio
+    async def test_limit_values_keep_their_format(self, risk_manager):
+        """Test USD limits print as before the float conversion ("10000", not "10000.00")"""
+        assert risk_manager.get_risk_status()['daily_volume_limit_usd'] == "100000"
+
+        oversized = {
+            'token_in': '0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174',
+            'token_out': '0x7ceB23fD6bC0adD59E62ac25578270cFf1b9f619',
+            'amount_in': 20_000_000_000,  # $20k USDC
+            'profit_usd': 0.1,
+        }
+        assessment = await risk_manager.assess_trade_risk(oversized)
+        assert "Position size $20000.00 exceeds limit $10000" in assessment.blockers
+        assert "Profit $0.10 below threshold $0.50" in assessment.blockers
+
+        risk_manager.daily_volume_cents = risk_manager.daily_volume_limit_cents
+        assessment = await risk_manager.assess_trade_risk({**oversized, 'amount_in': 1_000_000})
+        assert "Daily volume limit exceeded ($100000.00/$100000)" in assessment.blockers
+
 
 class TestFlashloanArbitrageBot:
     """Test suite for main arbitrage bot"""
@@ -563,6 +690,339 @@ class TestBotIntegration:
                 logger.info("✅ Component initialization order correct")
 
 
+class _Side(Enum):
+    BUY = 1
+
+
+class TestHelpers:
+    """Test cases for bot.utils.helpers"""
+
+    @pytest.mark.parametrize("address", [None, 123, b"0x2791bca1f2de4661ed88a30c99a7a9449aa84174", {}, ["0x"]])
+    def test_validate_address_rejects_non_strings(self, address):
+        """Test non-string (including unhashable) input is rejected rather than raising"""
+        assert validate_address(address) == False
+        assert validate_address(address, check_checksum=True) == False
+
+    def test_validate_address_checksum(self):
+        """Test address format and EIP-55 checksum validation"""
+        assert validate_address('0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174', check_checksum=True)
+        assert validate_address('0x2791bca1f2de4661ed88a30c99a7a9449aa84174')
+        assert not validate_address('0x2791bca1f2de4661ed88a30c99a7a9449aa84174', check_checksum=True)
+        assert not validate_address('0x123')
+
+    @pytest.mark.parametrize("wei_amount, decimals", [
+        # Tier boundaries: 0.01, 1 and 1000 tokens, and just below each
+        (10 ** 16, 18), (10 ** 16 - 1, 18),
+        (10 ** 18, 18), (10 ** 18 - 1, 18),
+        (1000 * 10 ** 18, 18), (1000 * 10 ** 18 - 1, 18),
+        (10_000, 6), (9_999, 6), (1_000_000, 6), (999_999_999, 6), (1_000_000_000, 6),
+        (5, 0), (1000, 0),
+        # Rounding ties (half-even) in each tier
+        (1000_005 * 10 ** 13, 18), (1000_015 * 10 ** 13, 18),
+        (100_005 * 10 ** 13, 18), (100_015 * 10 ** 13, 18),
+        (100_005 * 10 ** 11, 18), (100_015 * 10 ** 11, 18),
+        (5 * 10 ** 9, 18), (15 * 10 ** 9, 18),
+        (1_234_567_891_234_567_890_123, 18), (1, 8),
+    ])
+    def test_format_wei_int_matches_decimal(self, wei_amount, decimals):
+        """Test the integer format_wei fast path matches the Decimal formatting"""
+        # A str amount skips the int fast path and goes through Decimal
+        assert format_wei(wei_amount, decimals) == format_wei(str(wei_amount), decimals)
+        assert f"{_format_wei_int(wei_amount, decimals)} MATIC" == format_wei(str(wei_amount), decimals)
+
+    @pytest.mark.parametrize("age, from_cache", [(5.0, True), (29.0, True), (31.0, False)])
+    def test_gas_price_stale_cache_is_bounded(self, age, from_cache):
+        """Test a failed gas station fetch reuses the last response only up to the max staleness"""
+        url = "https://gas.test/v2"
+        cached = {"standard": {"maxFee": 123}}
+
+        with patch.dict(helpers._GAS_CACHE, ts=1000.0, url=url, data=cached, etag=None), \
+                patch.object(helpers._SESSION, 'get', side_effect=ConnectionError("gas station down")), \
+                patch('bot.utils.helpers.time.monotonic', return_value=1000.0 + age):
+            gas_price = helpers.calculate_gas_price("standard", url, ttl=3.0)
+
+        if from_cache:
+            assert gas_price == int(123 * helpers.GWEI_PER_ETH)
+        else:
+            assert gas_price == helpers._FALLBACK_GAS_WEI["standard"]
+
+    @pytest.mark.parametrize("data", [
+        {'timestamp': datetime(2026, 1, 2, 3, 4, 5, 678), 'profit': Decimal("1.50"), 'gas': None},
+        {'pair': 'USDC/WETH', 'trades': [1, 2.5, True], 'by_block': {1: 'a', 2: {}}},
+        {'symbol': 'café 🚀', 'note': 'quote " and \\ backslash'},
+        {'amount_in': 2 ** 70, 'ratio': np.float64(0.25), 'count': np.int64(3)},
+        # Floats json.dump writes in exponent form or as non-standard literals
+        {'tiny': 1e-7, 'large': 1e16, 'edge': 1e-5, 'huge': 1.5e300, 'fixed': [1e-4, 9999999999999998.0]},
+        {'profit': float('nan'), 'limit': float('inf'), 'floor': float('-inf')},
+        {'ratio': np.float64(1e-9)},
+        {'side': _Side.BUY},
+    ])
+    def test_save_json_file_matches_json_format(self, tmp_path, data):
+        """Test save_json_file writes the same text as json.dump(indent=2, default=str)"""
+        file_path = tmp_path / "out.json"
+
+        assert helpers.save_json_file(data, str(file_path))
+        assert file_path.read_text() == json.dumps(data, indent=2, default=str)
+
+    def test_save_json_file_rejects_date_keys_like_json(self, tmp_path):
+        """Test a datetime key fails as it does with json.dump instead of being stringified"""
+        data = {date(2020, 1, 1): 1}
+        with pytest.raises(TypeError):
+            json.dumps(data, indent=2, default=str)
+
+        assert helpers.save_json_file(data, str(tmp_path / "out.json")) == False
+
+    def test_rate_limiter_zero_window_is_unlimited(self):
+        """Test a zero time window disables limiting instead of raising"""
+        limiter = helpers.RateLimiter(max_calls=2, time_window=0)
+
+        assert all(limiter.is_allowed() for _ in range(10))
+        assert limiter.wait_time() == 0
+
+    def test_rate_limiter_limits_calls(self):
+        """Test the token bucket allows max_calls and then reports a wait"""
+        with patch('bot.utils.helpers.time.monotonic', return_value=100.0):
+            limiter = helpers.RateLimiter(max_calls=2, time_window=10)
+            assert limiter.is_allowed() and limiter.is_allowed()
+            assert not limiter.is_allowed()
+            assert limiter.wait_time() == pytest.approx(5.0)
+
+        assert helpers.RateLimiter(max_calls=0, time_window=10).wait_time() == 0
+
+    def test_retry_with_backoff_raises_non_transient_errors_immediately(self):
+        """Test a non-transient error (ValueError) is raised without retrying"""
+        func = Mock(side_effect=ValueError("bad input"))
+
+        with patch('bot.utils.helpers.time.sleep') as sleep:
+            with pytest.raises(ValueError):
+                helpers.retry_with_backoff(func, max_retries=3)()
+
+        assert func.call_count == 1
+        sleep.assert_not_called()
+
+    def test_retry_with_backoff_retries_transient_errors(self):
+        """Test network errors are retried, and retry_on=(Exception,) retries anything"""
+        flaky = Mock(side_effect=[ConnectionError("reset"), TimeoutError("slow"), "ok"])
+        failing = Mock(side_effect=ValueError("bad input"))
+
+        with patch('bot.utils.helpers.time.sleep') as sleep:
+            assert helpers.retry_with_backoff(flaky, max_retries=3)() == "ok"
+            with pytest.raises(ValueError):
+                helpers.retry_with_backoff(failing, max_retries=2, retry_on=(Exception,))()
+
+        assert flaky.call_count == 3
+        assert failing.call_count == 3
+        assert sleep.call_count == 4
+
+    def test_format_wei_tiers(self):
+        """Test format_wei precision tiers, including exactly 0.01"""
+        assert format_wei(10 ** 16) == "0.010000 MATIC"
+        assert format_wei(10 ** 16 - 1) == "0.01000000 MATIC"
+        assert format_wei(10 ** 18) == "1.0000 MATIC"
+        assert format_wei(1234 * 10 ** 18) == "1,234.00 MATIC"
+
+
+class TestNotificationBatcher:
+    """Test cases for NotificationBatcher"""
+
+    @staticmethod
+    def _profit(profit_usd):
+        return {'profit_usd': profit_usd, 'token_pair': 'USDC/WETH'}
+
+    @pytest.mark.asyncio
+    async def test_full_batch_flushes_immediately(self):
+        """Test a batch reaching max_batch_size is delivered without waiting for the interval"""
+        on_flush = AsyncMock()
+        batcher = NotificationBatcher(batch_interval=3600, on_flush=on_flush, max_batch_size=3)
+
+        for profit in (1.0, 2.0, 3.0):
+            batcher.add_to_batch('profit', self._profit(profit))
+        await asyncio.sleep(0)
+
+        on_flush.assert_awaited_once()
+        summaries = on_flush.await_args.args[0]
+        assert len(summaries) == 1
+        assert summaries[0]['title'] == "Trading Summary (3 trades)"
+        assert "**Total Profit:** $6.00" in summaries[0]['message']
+        assert 'profit' not in batcher.batches
+
+        await batcher.close()
+
+    @pytest.mark.asyncio
+    async def test_interval_flushes_all_batch_types(self):
+        """Test the flush loop delivers every batch type together each interval"""
+        on_flush = AsyncMock()
+        batcher = NotificationBatcher(batch_interval=0.01, on_flush=on_flush)
+
+        batcher.add_to_batch('profit', self._profit(1.0))
+        batcher.add_to_batch('opportunity', {'profit_percent': 1.5, 'token_pair': 'USDC/WETH'})
+        await asyncio.sleep(0.05)
+
+        on_flush.assert_awaited_once()
+        titles = [summary['title'] for summary in on_flush.await_args.args[0]]
+        assert titles == ["Trading Summary (1 trades)", "Opportunities Summary (1 found)"]
+
+        await batcher.close()
+
+    @pytest.mark.asyncio
+    async def test_close_flushes_pending_batches(self):
+        """Test close() delivers batches still waiting for the interval"""
+        on_flush = AsyncMock()
+        batcher = NotificationBatcher(batch_interval=3600, on_flush=on_flush)
+
+        batcher.add_to_batch('profit', self._profit(4.0))
+        await batcher.close()
+
+        on_flush.assert_awaited_once()
+        assert batcher._flush_task is None
+
+    @pytest.mark.asyncio
+    async def test_close_during_flush_keeps_batches(self):
+        """Test close() cancelling the loop mid-flush still delivers the batches it took out"""
+        started = asyncio.Event()
+        delivered = []
+
+        async def slow_flush(summaries):
+            started.set()
+            await asyncio.sleep(0.05)
+            delivered.extend(summaries)
+
+        batcher = NotificationBatcher(batch_interval=0.01, on_flush=slow_flush)
+        batcher.add_to_batch('profit', self._profit(1.0))
+        await asyncio.wait_for(started.wait(), timeout=1)
+
+        await batcher.close()
+
+        assert [summary['title'] for summary in delivered] == ["Trading Summary (1 trades)"]
+
+
+class TestAlertRateLimiter:
+    """Test cases for AlertRateLimiter"""
+
+    @pytest.fixture
+    def clock(self):
+        """Controllable monotonic clock for the limiter"""
+        with patch('bot.utils.notifications.time.monotonic', return_value=1000.0) as monotonic:
+            yield monotonic
+
+    @staticmethod
+    def _limiter(**config_kwargs):
+        """Rate limiter outside dry-run mode with quiet hours disabled unless requested"""
+        config_kwargs.setdefault('notification_quiet_start', None)
+        with patch.dict(os.environ, {'DRY_RUN_MODE': 'false'}):
+            return AlertRateLimiter(NotificationConfig(**config_kwargs))
+
+    @staticmethod
+    def _at(hour, minute=0):
+        """Patch the wall clock used for quiet hours"""
+        fake_datetime = Mock(wraps=datetime)
+        fake_datetime.now.return_value = datetime(2026, 1, 1, hour, minute)
+        return patch('bot.utils.notifications.datetime', fake_datetime)
+
+    def test_burst_limit(self, clock):
+        """Test a full bucket allows max_alerts_per_hour alerts, then blocks"""
+        limiter = self._limiter(max_alerts_per_hour=3)
+
+        for _ in range(3):
+            assert limiter.can_send_alert('general')
+            clock.return_value += 20  # Past the 15s minimum interval, far less than one refill
+        assert not limiter.can_send_alert('general'), "Burst should be capped at max_alerts_per_hour"
+
+    def test_refill(self, clock):
+        """Test tokens refill at max_alerts_per_hour per hour, capped at the bucket size"""
+        limiter = self._limiter(max_alerts_per_hour=3)
+        for _ in range(3):
+            assert limiter.can_send_alert('general')
+            clock.return_value += 20
+        assert not limiter.can_send_alert('general')
+
+        clock.return_value += 1200  # One token per 1200s at 3/hour
+        assert limiter.can_send_alert('general')
+
+        # A long idle period never banks more than one burst
+        clock.return_value += 10 * 3600
+        limiter.can_send_alert('status')
+        assert limiter.tokens == 2
+
+    def test_minimum_interval(self, clock):
+        """Test the per-type minimum interval between alerts"""
+        limiter = self._limiter()
+
+        assert limiter.can_send_alert('general')
+        clock.return_value += 10
+        assert not limiter.can_send_alert('general')
+        assert limiter.can_send_alert('status'), "Intervals are tracked per alert type"
+        clock.return_value += 10
+        assert limiter.can_send_alert('general')
+
+    @pytest.mark.parametrize("hour, minute, quiet", [
+        (22, 59, False), (23, 0, True), (23, 30, True), (2, 0, True), (7, 0, True), (7, 1, False), (12, 0, False),
+    ])
+    def test_quiet_hours_across_midnight(self, clock, hour, minute, quiet):
+        """Test an overnight quiet window (23:00-07:00) wraps past midnight"""
+        limiter = self._limiter(notification_quiet_start="23:00", notification_quiet_end="07:00")
+
+        with self._at(hour, minute):
+            assert limiter._is_quiet_hours() == quiet
+            assert limiter.can_send_alert('error') == (not quiet)
+
+    @pytest.mark.parametrize("hour, quiet", [(11, False), (12, True), (13, True), (14, False)])
+    def test_quiet_hours_same_day(self, clock, hour, quiet):
+        """Test a daytime quiet window"""
+        limiter = self._limiter(notification_quiet_start="12:00", notification_quiet_end="13:00")
+
+        with self._at(hour):
+            assert limiter._is_quiet_hours() == quiet
+
+    def test_dry_run(self, clock):
+        """Test alerts are skipped in dry-run mode unless dry_run_notifications is enabled"""
+        with patch.dict(os.environ, {'DRY_RUN_MODE': 'true'}):
+            silent = AlertRateLimiter(NotificationConfig(notification_quiet_start=None))
+            noisy = AlertRateLimiter(NotificationConfig(notification_quiet_start=None, dry_run_notifications=True))
+
+        assert not silent.can_send_alert('error')
+        assert noisy.can_send_alert('error')
+
+
+class TestNotificationSessions:
+    """Test cases for notification aiohttp session ownership"""
+
+    def test_shared_session_replaced_per_event_loop(self):
+        """Test a shared session left by a previous event loop is closed, not leaked"""
+        # Private loops - asyncio.run() would unset the session event loop used by other tests
+        old_loop, new_loop = asyncio.new_event_loop(), asyncio.new_event_loop()
+        try:
+            first = old_loop.run_until_complete(notifications._get_shared_session())
+            old_loop.close()
+            second = new_loop.run_until_complete(notifications._get_shared_session())
+
+            assert second is not first
+            assert first.closed, "Stale session from the old loop should be closed"
+            new_loop.run_until_complete(notifications.close_shared_session())
+            assert second.closed
+        finally:
+            old_loop.close()
+            new_loop.close()
+
+    @pytest.mark.asyncio
+    async def test_manager_close_keeps_shared_session(self):
+        """Test closing one NotificationManager doesn't close sessions it doesn't own"""
+        shared = await notifications._get_shared_session()
+        manager = NotificationManager(NotificationConfig())
+        other = NotificationManager(NotificationConfig())
+        own_session = await manager._get_session()
+        other_session = await other._get_session()
+
+        await manager.close()
+
+        assert own_session.closed
+        assert not shared.closed
+        assert not other_session.closed
+
+        await other.close()
+        await notifications.close_shared_session()
+
+
 # Performance and Load Tests
 class TestBotPerformance:
     """Performance and load testing for the bot"""
@@ -581,8 +581,9 @@ class TestFailureRecovery:
         assert assessment.is_safe == False, "Trades should be blocked"
 
         # Simulate time passing (circuit breaker timeout)
-        risk_manager.circuit_breaker_until = None  # Force reset for test
-        risk_manager._reset_circuit_breaker()
+        risk_manager._cb_until_mono = time.monotonic()  # Force cooldown expiry for test
+        await risk_manager.assess_trade_risk(test_opportunity)  # Moves the breaker to HALF_OPEN
+        await risk_manager._reset_circuit_breaker()
 
         assert risk_manager.circuit_breaker_active == False, "Circuit breaker should reset"
 